@@ -0,0 +1,145 @@
+"""
+Fusion Benchmark
+Compares incremental sliding-window voting in MultiCameraFusion against
+the previous rebuild-everything-per-call approach.
+
+Usage:
+    python3 benchmarks/bench_fusion.py [--frames 5000] [--windows 20 200 2000]
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection.multi_camera_fusion import MultiCameraFusion, CameraDetection  # noqa: E402
+
+
+class RebuildFusion(MultiCameraFusion):
+    """Previous implementation: list buffer, votes rebuilt on every call"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.detection_buffer = []
+    
+    def add_detections(self, detections):
+        filtered = [d for d in detections if d.confidence >= self.confidence_threshold]
+        if filtered:
+            self.detection_buffer.append(filtered)
+        if len(self.detection_buffer) > self.sample_frames:
+            self.detection_buffer.pop(0)
+    
+    def get_fused_detection(self):
+        if len(self.detection_buffer) < self.sample_frames // 2:
+            return None
+        
+        all_segments = []
+        segment_confidences = {}
+        for frame_detections in self.detection_buffer:
+            for det in frame_detections:
+                all_segments.append(det.segment)
+                segment_confidences.setdefault(det.segment, []).append(det.confidence)
+        
+        if not all_segments:
+            return None
+        
+        segment, count = Counter(all_segments).most_common(1)[0]
+        agreement = count / len(all_segments)
+        if agreement < self.min_agreement:
+            return None
+        
+        cameras = set()
+        for frame_detections in self.detection_buffer:
+            for det in frame_detections:
+                if det.segment == segment:
+                    cameras.add(det.camera_id)
+        
+        value, multiplier = self._parse_segment(segment)
+        confidences = segment_confidences[segment]
+        return (segment, value, multiplier, sum(confidences) / len(confidences), len(cameras), agreement)
+
+
+def make_frames(count: int, seed: int = 7) -> list[list[CameraDetection]]:
+    """Three cameras, mostly agreeing on T20 with some wire noise"""
+    rng = random.Random(seed)
+    segments = ['T20', 'T20', 'T20', '20', '1', 'T1', '5']
+    frames = []
+    for _ in range(count):
+        frames.append([
+            CameraDetection(
+                camera_id=cam,
+                segment=rng.choice(segments),
+                value=20,
+                multiplier=3,
+                confidence=rng.uniform(0.2, 1.0),
+                x=400,
+                y=100
+            )
+            for cam in range(3)
+        ])
+    return frames
+
+
+def run(fusion, frames) -> tuple[float, list]:
+    """Feed every frame and ask for a fused result each time, like the detector loop"""
+    results = []
+    start = time.perf_counter()
+    for frame in frames:
+        fusion.add_detections(frame)
+        results.append(fusion.get_fused_detection())
+    return len(frames) / (time.perf_counter() - start), results
+
+
+def as_tuple(fused):
+    if fused is None or isinstance(fused, tuple):
+        return fused
+    return (fused.segment, fused.value, fused.multiplier, fused.confidence, fused.num_cameras, fused.agreement)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=5000, help="Frames fed per run")
+    parser.add_argument("--windows", type=int, nargs="+", default=[20, 200, 2000], help="sample_frames values")
+    args = parser.parse_args()
+    
+    frames = make_frames(args.frames)
+    failed = False
+    
+    for window in args.windows:
+        old_rate, old_results = run(RebuildFusion(sample_frames=window, min_agreement=0.3), frames)
+        new_rate, new_results = run(MultiCameraFusion(sample_frames=window, min_agreement=0.3), frames)
+        
+        mismatched = 0
+        ties = 0
+        for old, new in zip(old_results, map(as_tuple, new_results)):
+            if old is None or new is None:
+                mismatched += old is not new
+                continue
+            if old[0] != new[0] and old[5] == new[5]:
+                # Two segments tied for the lead and were picked in a different order
+                ties += 1
+                continue
+            # Segment/cameras/agreement exact, confidence up to float drift
+            if old[:3] != new[:3] or old[4:] != new[4:] or abs(old[3] - new[3]) > 1e-9:
+                mismatched += 1
+        
+        print(
+            f"sample_frames={window:5d}  rebuild: {old_rate:9.0f} frames/s  "
+            f"incremental: {new_rate:9.0f} frames/s  ({new_rate / old_rate:6.1f}x)  "
+            f"mismatched: {mismatched}  tie order: {ties}"
+        )
+        failed = failed or mismatched > 0
+    
+    if failed:
+        print("FAIL: incremental voting disagrees with the rebuild approach")
+        return 1
+    
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
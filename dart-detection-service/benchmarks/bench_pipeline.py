@@ -0,0 +1,319 @@
+"""
+Pipeline Benchmark
+Drives the full detection pipeline (ClickCalibrator, TriangleDartDetector,
+ScoreCalculator, MultiCameraFusion) with synthetic frames from a board
+under a known homography, and reports per-stage throughput, end-to-end
+latency and scoring accuracy against the true dart tips as JSON.
+
+Usage:
+    python3 benchmarks/bench_pipeline.py [--darts 30] [--max-area 5000] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import SyntheticBoard, SyntheticDart, default_cameras  # noqa: E402
+from detection.camera_manager import CapturedFrame  # noqa: E402
+from detection.click_calibrator import ClickCalibrator  # noqa: E402
+from detection.dart_detector import DartDetector  # noqa: E402
+from detection.multi_camera_fusion import MultiCameraFusion, CameraDetection  # noqa: E402
+from detection.triangle_detector import TriangleDartDetector  # noqa: E402
+
+
+class SyntheticCameraManager:
+    """
+    CameraManager stand-in serving whatever frames the benchmark sets.
+    
+    Frames are stamped on a virtual clock (one frame interval per set), so
+    anything timed in frame time gives the same result on any host.
+    """
+    
+    def __init__(self, frame_interval: float = 0.033):
+        self.cameras: dict[int, object] = {}
+        self.frames: dict[int, CapturedFrame] = {}
+        self.sequence = 0
+        self.frame_interval = frame_interval
+    
+    def set_frames(self, frames: dict[int, np.ndarray]):
+        """Publish the next frame for every camera"""
+        self.sequence += 1
+        now = self.sequence * self.frame_interval
+        self.frames = {cam: CapturedFrame(frame, now, self.sequence) for cam, frame in frames.items()}
+    
+    def open_camera(self, index: int, width: int = 640, height: int = 480, fps: int = 30):
+        self.cameras[index] = index
+        return index
+    
+    def get_latest_frame(self, index: int) -> Optional[CapturedFrame]:
+        return self.frames.get(index)
+    
+    def read_frame(self, index: int):
+        captured = self.frames.get(index)
+        return (captured is not None), (captured.frame if captured else None)
+    
+    def wait_for_frames(self, timeout: float = 1.0) -> bool:
+        return True
+    
+    def is_exhausted(self) -> bool:
+        return False
+    
+    def release_camera(self, index: int):
+        self.cameras.pop(index, None)
+    
+    def release_all(self):
+        self.cameras.clear()
+    
+    def is_camera_open(self, index: int) -> bool:
+        return index in self.cameras
+
+
+def summarize(values: list[float]) -> Optional[dict]:
+    """Mean / median / p95 / max of a sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 3),
+        "median": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+def time_stage(fn, iterations: int) -> dict:
+    """Per-call milliseconds and calls per second for fn()"""
+    fn()  # Warm up (builds remap/LUT caches)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    mean_ms = statistics.fmean(samples)
+    return {
+        "ms": summarize(samples),
+        "fps": round(1000 / mean_ms, 1) if mean_ms > 0 else None
+    }
+
+
+def bench_stages(board: SyntheticBoard, calibrator: ClickCalibrator, triangle_detector: TriangleDartDetector,
+                 cameras, iterations: int, commit_margin: Optional[float] = None) -> dict:
+    """Time each pipeline stage on one camera with one dart on the board"""
+    camera = cameras[0]
+    dart = SyntheticDart(board.board_size * 0.6, board.board_size * 0.4, 0.8, 200, 70)
+    empty = board.render_camera(camera, [])
+    frame = board.render_camera(camera, [dart])
+    
+    def prepare(image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+    
+    reference = prepare(calibrator.transform_frame(empty, camera.camera_id))
+    warped = calibrator.transform_frame(frame, camera.camera_id)
+    blurred = prepare(warped)
+    diff = cv2.absdiff(reference, blurred)
+    
+    scorer = board.scorer
+    fusion = MultiCameraFusion(sample_frames=20, commit_margin=commit_margin)
+    detection = CameraDetection(0, "T20", 20, 3, 0.9, 400, 160)
+    
+    def fuse():
+        fusion.add_detections([detection])
+        fusion.get_early_detection()
+    
+    stages = {
+        "warp": lambda: calibrator.transform_frame(frame, camera.camera_id),
+        "gray_blur": lambda: prepare(warped),
+        "absdiff": lambda: cv2.absdiff(reference, blurred),
+        "find_contours": lambda: triangle_detector.find_contours(diff),
+        "detect_dart": lambda: triangle_detector.detect_dart(diff, top_n=1),
+        "lookup_score": lambda: scorer.lookup_score(480, 320),
+        "fusion": fuse,
+    }
+    return {name: time_stage(fn, iterations) for name, fn in stages.items()}
+
+
+async def bench_end_to_end(board: SyntheticBoard, calibrator: ClickCalibrator,
+                           triangle_detector: TriangleDartDetector, cameras, args) -> dict:
+    """Throw synthetic darts through a real DartDetector and score its events"""
+    manager = SyntheticCameraManager(args.frame_interval)
+    events = []
+    
+    async def on_dart(event):
+        events.append(event)
+    
+    camera_ids = [camera.camera_id for camera in cameras]
+    detector = DartDetector(
+        camera_indices=camera_ids,
+        on_dart_detected=on_dart,
+        calibrator=calibrator,
+        triangle_detector=triangle_detector,
+        camera_manager=manager,
+        processing_mode="inline",
+        fusion_mode=args.fusion_mode,
+        fusion_commit_margin=args.commit_margin
+    )
+    for cam in camera_ids:
+        detector.cameras[cam] = manager.open_camera(cam)
+    
+    def show(darts):
+        manager.set_frames({
+            camera.camera_id: board.render_camera(camera, darts, args.noise) for camera in cameras
+        })
+    
+    tick_ms = []
+    latency_frames = []
+    latency_ms = []
+    detected = 0
+    correct_segment = 0
+    correct_score = 0
+    false_events = 0
+    
+    async def tick() -> float:
+        start = time.perf_counter()
+        await detector._check_for_darts()
+        elapsed = (time.perf_counter() - start) * 1000
+        tick_ms.append(elapsed)
+        return elapsed
+    
+    thrown = 0
+    while thrown < args.darts:
+        # New visit: darts removed, reference re-taken on the empty board
+        darts = []
+        show(darts)
+        detector.capture_reference()
+        detector.camera_fusion.reset_buffer()
+        
+        for _ in range(min(3, args.darts - thrown)):
+            # Idle frames before the throw: any event here is a false positive
+            for _ in range(args.idle_frames):
+                show(darts)
+                before = len(events)
+                await tick()
+                false_events += len(events) - before
+            
+            dart = board.random_dart()
+            darts.append(dart)
+            thrown += 1
+            truth = board.true_segment(dart)
+            truth_score = board.scorer.calculate_score_analytic(int(dart.tip_x), int(dart.tip_y))
+            
+            processing = 0.0
+            for frame_number in range(1, args.frames_per_dart + 1):
+                show(darts)
+                before = len(events)
+                processing += await tick()
+                if len(events) > before:
+                    event = events[-1]
+                    detected += 1
+                    latency_frames.append(frame_number)
+                    latency_ms.append(processing)
+                    if event['segment'] == truth:
+                        correct_segment += 1
+                    if event['value'] * event['multiplier'] == truth_score.value * truth_score.multiplier:
+                        correct_score += 1
+                    false_events += len(events) - before - 1
+                    break
+            else:
+                # Missed: take a fresh reference so the next dart is diffed alone
+                detector.capture_reference()
+                detector.camera_fusion.reset_buffer()
+    
+    frame_interval_ms = args.frame_interval * 1000
+    return {
+        "darts": thrown,
+        "detected": detected,
+        "detection_rate": round(detected / thrown, 3) if thrown else None,
+        "segment_accuracy": round(correct_segment / detected, 3) if detected else None,
+        "score_accuracy": round(correct_score / detected, 3) if detected else None,
+        "segment_accuracy_of_thrown": round(correct_segment / thrown, 3) if thrown else None,
+        "false_events": false_events,
+        "latency_frames": summarize(latency_frames),
+        "latency_processing_ms": summarize(latency_ms),
+        # Wall-clock estimate at the live loop rate: frames waited plus processing
+        "latency_estimated_ms": summarize([
+            (frames - 1) * frame_interval_ms + ms for frames, ms in zip(latency_frames, latency_ms)
+        ]),
+        "tick_ms": summarize(tick_ms),
+        "tick_fps": round(1000 / statistics.fmean(tick_ms), 1) if tick_ms else None,
+        "fusion": detector.get_processing_stats()["fusion"],
+        "motion_gate": detector.get_processing_stats()["motion_gate"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--darts", type=int, default=30, help="Darts to throw end to end")
+    parser.add_argument("--frames-per-dart", type=int, default=30, help="Frames to wait for an event before counting a miss")
+    parser.add_argument("--idle-frames", type=int, default=5, help="Empty frames before each throw (false-event check)")
+    parser.add_argument("--stage-iterations", type=int, default=200, help="Calls per stage measurement")
+    parser.add_argument("--board-size", type=int, default=800, help="Board space size (pixels)")
+    parser.add_argument("--tilt", type=float, default=0.0, help="Camera perspective tilt (board pixels)")
+    parser.add_argument("--noise", type=int, default=4, help="Sensor noise amplitude (0-255)")
+    parser.add_argument("--min-area", type=int, default=100, help="TriangleDartDetector min_area")
+    parser.add_argument("--max-area", type=int, default=5000, help="TriangleDartDetector max_area")
+    parser.add_argument("--pyramid-levels", type=int, default=0, help="TriangleDartDetector pyramid levels",
+                        choices=range(TriangleDartDetector.MAX_PYRAMID_LEVELS + 1))
+    parser.add_argument("--fusion-mode", choices=MultiCameraFusion.MODES, default="vote")
+    parser.add_argument("--commit-margin", type=float, default=None,
+                        help="Fusion early-commit margin (default: off, full window only)")
+    parser.add_argument("--frame-interval", type=float, default=0.033, help="Live loop interval for latency estimates (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+    
+    board = SyntheticBoard(args.board_size, seed=args.seed)
+    cameras = default_cameras(args.tilt)
+    
+    area_scale = (args.board_size / 800) ** 2
+    triangle_detector = TriangleDartDetector(
+        min_area=int(args.min_area * area_scale),
+        max_area=int(args.max_area * area_scale),
+        pyramid_levels=args.pyramid_levels
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        calibrator = ClickCalibrator((args.board_size, args.board_size), db_path=str(Path(tmp) / "calibration.db"))
+        for camera in cameras:
+            result = calibrator.calibrate_with_clicks(camera.camera_id, *camera.clicks(args.board_size))
+            if not result.success:
+                print(f"Calibration failed for camera {camera.camera_id}: {result.message}", file=sys.stderr)
+                return 1
+        
+        stages = bench_stages(board, calibrator, triangle_detector, cameras, args.stage_iterations, args.commit_margin)
+        end_to_end = asyncio.run(bench_end_to_end(board, calibrator, triangle_detector, cameras, args))
+    
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__
+        },
+        "stages": stages,
+        "end_to_end": end_to_end
+    }
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+        print(f"Wrote {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
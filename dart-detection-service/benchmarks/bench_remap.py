@@ -0,0 +1,82 @@
+"""
+Remap Benchmark
+Compares cached remap tables against per-frame warpPerspective.
+
+Usage:
+    python3 benchmarks/bench_remap.py [--frames 200] [--tolerance 2]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection.click_calibrator import ClickCalibrator  # noqa: E402
+
+
+def make_frame(width: int = 640, height: int = 480) -> np.ndarray:
+    """Textured test frame so interpolation differences are visible"""
+    rng = np.random.default_rng(42)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(frame, (5, 5), 0)
+
+
+def time_it(fn, frames: int) -> float:
+    """Return frames per second for fn()"""
+    fn()  # Warm up (also builds the remap cache)
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200, help="Frames per measurement")
+    parser.add_argument("--tolerance", type=int, default=2, help="Max allowed per-pixel difference")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        calibrator = ClickCalibrator(target_size=(800, 800), db_path=f"{tmp}/calibration.db")
+        
+        # Slightly off-axis clicks so the homography is not a pure scale
+        result = calibrator.calibrate_with_clicks(0, 320, 240, 325, 40, 515, 236)
+        if not result.success:
+            print(f"Calibration failed: {result.message}")
+            return 1
+        
+        frame = make_frame()
+        matrix = calibrator.calibrations[0]['transform_matrix']
+        
+        def warp():
+            return cv2.warpPerspective(frame, matrix, calibrator.target_size)
+        
+        def remap():
+            return calibrator.transform_frame(frame, 0)
+        
+        warp_fps = time_it(warp, args.frames)
+        remap_fps = time_it(remap, args.frames)
+        
+        diff = cv2.absdiff(warp(), remap())
+        max_diff = int(diff.max())
+        mismatched = float(np.count_nonzero(diff > args.tolerance)) / diff.size
+    
+    print(f"warpPerspective: {warp_fps:8.1f} fps")
+    print(f"cached remap:    {remap_fps:8.1f} fps  ({remap_fps / warp_fps:.2f}x)")
+    print(f"max pixel diff:  {max_diff} (tolerance {args.tolerance}), mismatched: {mismatched:.4%}")
+    
+    if max_diff > args.tolerance:
+        print("FAIL: remap output differs from warpPerspective beyond tolerance")
+        return 1
+    
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Score Lookup Table Benchmark
+Verifies the board orientation (20 at the top of board space), the
+ScoreCalculator lookup table against the analytic path on every board
+pixel and the batch API against the scalar one, then compares scoring
+throughput.
+
+Usage:
+    python3 benchmarks/bench_score_lut.py [--size 800] [--points 100000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection.click_calibrator import ClickCalibrator  # noqa: E402
+from detection.score_calculator import ScoreCalculator  # noqa: E402
+
+
+def verify_exhaustive(calculator: ScoreCalculator) -> int:
+    """Compare lookup and analytic scoring for every pixel, return mismatch count"""
+    width, height = calculator.size
+    mismatches = 0
+    
+    for y in range(height):
+        for x in range(width):
+            expected = calculator.calculate_score_analytic(x, y)
+            segment, value, multiplier = calculator.lookup_score(x, y)
+            
+            if (segment, value, multiplier) != (expected.segment, expected.value, expected.multiplier):
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"  mismatch at ({x}, {y}): lookup {segment}, analytic {expected.segment}")
+    
+    return mismatches
+
+
+def verify_orientation(calculator: ScoreCalculator) -> int:
+    """
+    Score the middle of the single bed at each clock position, return mismatch count.
+    
+    Board space has y pointing down with 20 at the top (the calibration
+    click at 12 o'clock lands at the smallest y), so a mirrored angle
+    convention shows up here as T20 scoring as T3.
+    """
+    cx, cy = calculator.center
+    r = calculator.radii
+    single = (r['triple_outer'] + r['double_inner']) / 2
+    mismatches = 0
+    
+    for position, number in enumerate(ScoreCalculator.SEGMENTS):
+        theta = np.radians(position * 18)  # Clockwise from top
+        x = int(round(cx + single * np.sin(theta)))
+        y = int(round(cy - single * np.cos(theta)))
+        
+        for name, result in (
+            ("analytic", calculator.calculate_score_analytic(x, y).segment),
+            ("lookup", calculator.lookup_score(x, y)[0])
+        ):
+            if result != str(number):
+                mismatches += 1
+                print(f"  orientation mismatch at ({x}, {y}): {name} {result}, expected {number}")
+    
+    return mismatches
+
+
+def verify_batch(calculator: ScoreCalculator, points: np.ndarray) -> int:
+    """Compare calculate_scores against the scalar API, return mismatch count"""
+    mismatches = 0
+    
+    for compensation in (None, 0.215):
+        batch = calculator.calculate_scores(points, compensation)
+        segments = batch.segments()
+        
+        for i, (x, y) in enumerate(points.tolist()):
+            if compensation is None:
+                expected = calculator.calculate_score(x, y)
+            else:
+                expected = calculator.calculate_score_with_tip_compensation(x, y, compensation)
+            
+            same = (
+                expected.segment == segments[i]
+                and expected.value == batch.value[i]
+                and expected.multiplier == batch.multiplier[i]
+                and expected.radius == batch.radius[i]
+                and abs(expected.angle - batch.angle[i]) < 1e-9
+            )
+            if not same:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"  batch mismatch at ({x}, {y}), compensation {compensation}")
+    
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=800, help="Board space size (pixels)")
+    parser.add_argument("--points", type=int, default=100000, help="Random points for throughput")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        calibrator = ClickCalibrator(target_size=(args.size, args.size), db_path=f"{tmp}/calibration.db")
+    
+    start = time.perf_counter()
+    calculator = ScoreCalculator(calibrator.board_center, calibrator.ring_radii)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"lookup table build: {build_ms:.1f} ms ({calculator.lookup_table.nbytes} bytes)")
+    
+    print("verifying board orientation...")
+    mismatches = verify_orientation(calculator)
+    
+    print(f"verifying {args.size}x{args.size} pixels...")
+    mismatches += verify_exhaustive(calculator)
+    
+    rng = np.random.default_rng(1)
+    
+    # Batch API, including points off the board image
+    margin = args.size // 4
+    batch_points = rng.integers(-margin, args.size + margin, (args.points, 2))
+    print(f"verifying batch API on {len(batch_points)} points...")
+    mismatches += verify_batch(calculator, batch_points)
+    
+    points = [(int(x), int(y)) for x, y in rng.integers(0, args.size, (args.points, 2))]
+    
+    start = time.perf_counter()
+    for x, y in points:
+        calculator.calculate_score_analytic(x, y)
+    analytic_rate = len(points) / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for x, y in points:
+        calculator.lookup_score(x, y)
+    lookup_rate = len(points) / (time.perf_counter() - start)
+    
+    point_array = np.array(points)
+    start = time.perf_counter()
+    calculator.calculate_scores(point_array)
+    batch_rate = len(points) / (time.perf_counter() - start)
+    
+    print(f"analytic: {analytic_rate:10.0f} scores/s")
+    print(f"lookup:   {lookup_rate:10.0f} scores/s  ({lookup_rate / analytic_rate:.1f}x)")
+    print(f"batch:    {batch_rate:10.0f} scores/s  ({batch_rate / analytic_rate:.1f}x)")
+    
+    if mismatches:
+        print(f"FAIL: {mismatches} results disagree with the reference path")
+        return 1
+    
+    print("OK: orientation correct, lookup table and batch API match the reference path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Synthetic Dartboard Renderer
+Renders camera frames of a dartboard seen through a known homography, with
+darts at known tip positions, so benchmarks have exact ground truth.
+
+Darts are drawn in the board plane as the wedge they leave in a difference
+image: a triangle from the tip out to the flight.
+"""
+import math
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection.score_calculator import ScoreCalculator  # noqa: E402
+
+# BGR colors
+BOARD_BLACK = (30, 30, 30)
+BOARD_CREAM = (200, 225, 235)
+BOARD_RED = (40, 40, 200)
+BOARD_GREEN = (60, 150, 40)
+SURROUND = (25, 25, 25)
+WALL = (90, 100, 110)
+DART = (210, 160, 140)
+
+# Dart wedge size ranges in board pixels at board_size 800: long and thin,
+# like a dart seen from above. After the detector's dilation nearly all give
+# contours of 500-4500 px, inside TriangleDartDetector's default max_area
+# (5000); shorter or wider wedges lose their tip or grow past it
+DART_LENGTH = (240, 280)
+DART_WIDTH = (10, 16)
+
+
+@dataclass
+class SyntheticDart:
+    """A dart with a known tip in board coordinates"""
+    tip_x: float
+    tip_y: float
+    angle: float   # Direction from tip to flight (radians)
+    length: float  # Tip to flight (board pixels)
+    width: float   # Flight width (board pixels)
+    
+    def polygon(self) -> np.ndarray:
+        """Wedge corners in board coordinates"""
+        tip = np.array([self.tip_x, self.tip_y])
+        direction = np.array([math.cos(self.angle), math.sin(self.angle)])
+        normal = np.array([-direction[1], direction[0]])
+        base = tip + direction * self.length
+        return np.array([tip, base + normal * self.width / 2, base - normal * self.width / 2])
+
+
+@dataclass
+class SyntheticCamera:
+    """
+    Camera looking at the board through a known homography.
+    
+    With tilt = (0, 0) the view is exactly the square model ClickCalibrator
+    assumes; non-zero tilt adds perspective it cannot undo.
+    """
+    camera_id: int
+    center: tuple[float, float]  # Bullseye in camera pixels
+    radius: float                # Outer double radius in camera pixels
+    tilt: tuple[float, float] = (0.0, 0.0)
+    resolution: tuple[int, int] = (640, 480)
+    
+    def homography(self, board_size: int) -> np.ndarray:
+        """Board space -> camera pixels"""
+        half = board_size / 2
+        scale = self.radius / half
+        
+        # Perspective about the board center, then scale and place
+        to_center = np.array([[1, 0, -half], [0, 1, -half], [0, 0, 1]], dtype=np.float64)
+        perspective = np.array([
+            [1, 0, 0],
+            [0, 1, 0],
+            [self.tilt[0] / half, self.tilt[1] / half, 1]
+        ], dtype=np.float64)
+        place = np.array([
+            [scale, 0, self.center[0]],
+            [0, scale, self.center[1]],
+            [0, 0, 1]
+        ], dtype=np.float64)
+        
+        return place @ perspective @ to_center
+    
+    def project(self, x: float, y: float, board_size: int) -> tuple[float, float]:
+        """Board point -> camera pixel"""
+        point = np.array([[[x, y]]], dtype=np.float64)
+        projected = cv2.perspectiveTransform(point, self.homography(board_size))
+        return float(projected[0, 0, 0]), float(projected[0, 0, 1])
+    
+    def clicks(self, board_size: int) -> tuple[int, int, int, int, int, int]:
+        """The 3 calibration clicks a user would make (center, top, right)"""
+        half = board_size / 2
+        center = self.project(half, half, board_size)
+        top = self.project(half, 0, board_size)
+        right = self.project(board_size, half, board_size)
+        return tuple(int(round(v)) for v in (*center, *top, *right))
+
+
+class SyntheticBoard:
+    """Renders board-space and camera-space frames with darts"""
+    
+    def __init__(self, board_size: int = 800, ring_radii: Optional[dict] = None, seed: int = 0):
+        self.board_size = board_size
+        self.rng = np.random.default_rng(seed)
+        
+        if ring_radii is None:
+            # Same geometry as ClickCalibrator
+            scale = board_size / (2 * 170)
+            ring_radii = {
+                'double_outer': int(170 * scale),
+                'double_inner': int(160 * scale),
+                'triple_outer': int(107 * scale),
+                'triple_inner': int(97 * scale),
+                'bull_outer': int(16 * scale),
+                'bull_inner': int(7 * scale)
+            }
+        
+        self.scorer = ScoreCalculator((board_size // 2, board_size // 2), ring_radii)
+        self.board = self._paint_board()
+        self._noise_bank: dict[tuple, list[np.ndarray]] = {}
+    
+    def _paint_board(self) -> np.ndarray:
+        """Color each board pixel from its score code"""
+        palette = np.zeros((len(ScoreCalculator.CODE_SCORES), 3), dtype=np.uint8)
+        palette[ScoreCalculator.MISS_CODE] = SURROUND
+        palette[ScoreCalculator.OUTER_BULL_CODE] = BOARD_GREEN
+        palette[ScoreCalculator.BULL_CODE] = BOARD_RED
+        
+        for position, number in enumerate(ScoreCalculator.SEGMENTS):
+            dark = position % 2 == 0
+            palette[ScoreCalculator.encode(number, 1)] = BOARD_BLACK if dark else BOARD_CREAM
+            palette[ScoreCalculator.encode(number, 2)] = BOARD_RED if dark else BOARD_GREEN
+            palette[ScoreCalculator.encode(number, 3)] = BOARD_RED if dark else BOARD_GREEN
+        
+        return palette[self.scorer.lookup_table]
+    
+    def random_dart(self, max_radius_fraction: float = 0.95) -> SyntheticDart:
+        """Dart with a uniformly random tip on the scoring area"""
+        outer = self.scorer.radii['double_outer'] * max_radius_fraction
+        radius = outer * math.sqrt(self.rng.uniform())
+        theta = self.rng.uniform(0, 2 * math.pi)
+        center = self.board_size / 2
+        
+        return SyntheticDart(
+            tip_x=center + radius * math.cos(theta),
+            tip_y=center + radius * math.sin(theta),
+            angle=self.rng.uniform(0, 2 * math.pi),
+            length=self.rng.uniform(*DART_LENGTH) * self.board_size / 800,
+            width=self.rng.uniform(*DART_WIDTH) * self.board_size / 800
+        )
+    
+    def true_segment(self, dart: SyntheticDart) -> str:
+        """Ground-truth segment for a dart tip"""
+        return self.scorer.calculate_score_analytic(int(dart.tip_x), int(dart.tip_y)).segment
+    
+    def render_board(self, darts: list[SyntheticDart]) -> np.ndarray:
+        """Board-space image with darts drawn on"""
+        image = self.board.copy()
+        for dart in darts:
+            cv2.fillPoly(image, [np.round(dart.polygon()).astype(np.int32)], DART, lineType=cv2.LINE_AA)
+        return image
+    
+    def render_camera(
+        self,
+        camera: SyntheticCamera,
+        darts: list[SyntheticDart],
+        noise: int = 4
+    ) -> np.ndarray:
+        """Camera frame: board warped through the camera homography, plus sensor noise"""
+        frame = cv2.warpPerspective(
+            self.render_board(darts),
+            camera.homography(self.board_size),
+            camera.resolution,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=WALL
+        )
+        
+        if noise > 0:
+            frame = cv2.add(frame, self._noise(camera.resolution, noise))
+        return frame
+    
+    def _noise(self, resolution: tuple[int, int], amplitude: int) -> np.ndarray:
+        """Cycle through a small bank of pre-generated noise frames"""
+        key = (resolution, amplitude)
+        bank = self._noise_bank.get(key)
+        if bank is None:
+            width, height = resolution
+            bank = [
+                self.rng.integers(0, amplitude + 1, (height, width, 3), dtype=np.uint8)
+                for _ in range(8)
+            ]
+            self._noise_bank[key] = bank
+        return bank[int(self.rng.integers(len(bank)))]
+
+
+def default_cameras(tilt: float = 0.0) -> list[SyntheticCamera]:
+    """Three cameras at slightly different positions and scales"""
+    return [
+        SyntheticCamera(0, (320, 240), 210, (tilt, 0.0)),
+        SyntheticCamera(1, (300, 250), 200, (0.0, tilt)),
+        SyntheticCamera(2, (340, 235), 220, (-tilt, 0.0)),
+    ]
@@ -0,0 +1,164 @@
+"""
+Calibration Artifact Cache
+Persists arrays derived from a calibration (remap tables, score lookup
+table) as .npy files keyed by a hash of their inputs.
+
+Loading memory-maps the file, which only reads its header; pages come in
+from disk the first time a frame touches them. Startup cost therefore no
+longer grows with the number of cameras or the table sizes. Saves run on
+a background thread and replace files atomically, so a crash never leaves
+a half-written artifact behind.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout or meaning of any artifact changes, so old files are ignored
+ARTIFACT_VERSION = 2
+
+WRITER_THREAD = "artifact-writer"
+
+
+def artifact_key(kind: str, *parts) -> str:
+    """
+    Stable name for an artifact built from the given inputs.
+    
+    Args:
+        kind: Artifact type (prefix of the file name)
+        parts: Inputs the artifact depends on (arrays hash by dtype, shape and bytes)
+    """
+    digest = hashlib.sha1(f"{kind}:{ARTIFACT_VERSION}".encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype.str}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+    return f"{kind}-{digest.hexdigest()[:16]}"
+
+
+class ArtifactCache:
+    """Directory of memory-mapped .npy artifacts"""
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Where artifact files live (created on first save)
+        """
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=WRITER_THREAD)
+    
+    def _path(self, key: str, part: str) -> Path:
+        return self.directory / f"{key}.{part}.npy"
+    
+    def load(self, key: str, parts: tuple[str, ...] = ("data",)) -> Optional[tuple[np.ndarray, ...]]:
+        """
+        Memory-map a saved artifact.
+        
+        Args:
+            key: Name from artifact_key()
+            parts: Array names the artifact was saved with
+        
+        Returns:
+            Read-only arrays in parts order, or None if any is missing or unreadable
+        """
+        try:
+            arrays = tuple(np.load(self._path(key, part), mmap_mode="r") for part in parts)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable artifact {key}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return arrays
+    
+    def save(self, key: str, arrays: dict[str, np.ndarray]):
+        """
+        Write an artifact in the background (never blocks on disk).
+        
+        Args:
+            key: Name from artifact_key()
+            arrays: Part name -> array
+        """
+        self.submit(self._write, key, arrays)
+    
+    def submit(self, fn: Callable, *args):
+        """
+        Run artifact work (e.g. building a table to save) on the writer thread.
+        Work submitted from the writer thread itself runs immediately, so
+        flush() covers it too.
+        """
+        if threading.current_thread().name.startswith(WRITER_THREAD):
+            fn(*args)
+        else:
+            self._writer.submit(self._run, fn, args)
+    
+    @staticmethod
+    def _run(fn: Callable, args: tuple):
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"Artifact task failed: {e}")
+    
+    def _write(self, key: str, arrays: dict[str, np.ndarray]):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for part, array in arrays.items():
+                path = self._path(key, part)
+                temp = path.with_name(path.name + ".tmp")
+                with open(temp, "wb") as f:
+                    np.save(f, np.ascontiguousarray(array))
+                os.replace(temp, path)
+            with self._lock:
+                self.saved += 1
+            logger.info(f"Saved artifact {key}")
+        except Exception as e:
+            logger.error(f"Failed to save artifact {key}: {e}")
+    
+    def prune(self, kind: str, keep: set[str]):
+        """Delete artifacts of one kind whose key is not in keep (in the background)"""
+        self.submit(self._prune, kind, keep)
+    
+    def _prune(self, kind: str, keep: set[str]):
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.glob(f"{kind}-*.npy"):
+            if path.name.split(".", 1)[0] not in keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Failed to remove stale artifact {path.name}: {e}")
+    
+    def flush(self):
+        """Wait for queued saves to finish"""
+        self._writer.submit(lambda: None).result()
+    
+    def close(self):
+        """Finish queued saves and stop the writer thread"""
+        self._writer.shutdown(wait=True)
+    
+    def get_stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "saved": self.saved
+        }
@@ -0,0 +1,104 @@
+"""
+Background Model
+Running-average background per camera, used as the reference that frames
+are diffed against.
+
+Quiet frames (the motion gate found nothing) are blended into float32
+accumulators in place, so slow lighting drift is absorbed and sensor noise
+averages out instead of being frozen into a single reference frame. The
+model is only rebased onto a specific frame when the board really changed
+(a dart landed, or darts were taken out).
+"""
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class BackgroundModel:
+    """Per-camera running averages of the diff image and the motion gate image"""
+    
+    def __init__(self, alpha: float = 0.05, gate_alpha: float = 0.05):
+        """
+        Args:
+            alpha: Weight of each new frame in the diff-image average
+            gate_alpha: Weight of each new frame in the gate-image average
+        """
+        self.alpha = alpha
+        self.gate_alpha = gate_alpha
+        
+        self.frozen = False  # Set while a detection is being accumulated
+        
+        self.updates: dict[int, int] = {}       # Diff-image updates per camera
+        self.gate_updates: dict[int, int] = {}  # Gate-image updates per camera
+        self.rebases: dict[int, int] = {}       # Times the model was reset onto a frame
+        
+        self._board: dict[int, np.ndarray] = {}  # camera -> float32 accumulator
+        self._gate: dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()  # Guards rebase against worker-thread updates
+    
+    def rebase(self, cam_idx: int, board: np.ndarray, gate: Optional[np.ndarray] = None):
+        """
+        Reset a camera's model onto one frame (the board changed for real).
+        
+        Args:
+            cam_idx: Camera index
+            board: Prepared (blurred grayscale) frame
+            gate: Motion gate image of the same frame
+        """
+        with self._lock:
+            self._board[cam_idx] = board.astype(np.float32)
+            if gate is not None:
+                self._gate[cam_idx] = gate.astype(np.float32)
+            self.rebases[cam_idx] = self.rebases.get(cam_idx, 0) + 1
+    
+    def update(self, cam_idx: int, board: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Blend a quiet prepared frame into the diff-image average.
+        
+        Returns:
+            The new reference (uint8), or None if frozen or not seeded
+        """
+        with self._lock:
+            accumulator = self._board.get(cam_idx)
+            if self.frozen or accumulator is None:
+                return None
+            cv2.accumulateWeighted(board, accumulator, self.alpha)
+            self.updates[cam_idx] = self.updates.get(cam_idx, 0) + 1
+            return cv2.convertScaleAbs(accumulator)
+    
+    def update_gate(self, cam_idx: int, gate: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Blend a quiet gate image into the gate average.
+        
+        Returns:
+            The new gate reference (uint8), or None if frozen or not seeded
+        """
+        with self._lock:
+            accumulator = self._gate.get(cam_idx)
+            if self.frozen or accumulator is None:
+                return None
+            cv2.accumulateWeighted(gate, accumulator, self.gate_alpha)
+            self.gate_updates[cam_idx] = self.gate_updates.get(cam_idx, 0) + 1
+            return cv2.convertScaleAbs(accumulator)
+    
+    def clear(self):
+        with self._lock:
+            self._board.clear()
+            self._gate.clear()
+    
+    def get_stats(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "gate_alpha": self.gate_alpha,
+            "frozen": self.frozen,
+            "cameras": {
+                cam_idx: {
+                    "updates": self.updates.get(cam_idx, 0),
+                    "gate_updates": self.gate_updates.get(cam_idx, 0),
+                    "rebases": self.rebases.get(cam_idx, 0)
+                }
+                for cam_idx in self._board
+            }
+        }
@@ -0,0 +1,412 @@
+"""
+Event Broadcaster
+Fans detection events out to WebSocket clients without the detector ever
+awaiting a socket.
+
+Each event is serialized once and put on a bounded queue per client; a
+sender task per client drains its queue. A slow client only falls behind
+(and eventually loses events or is disconnected, per policy) - it never
+delays detection or the other clients.
+
+Events carry a monotonically increasing "seq" and the most recent ones are
+kept (already serialized) in a ring, so a reconnecting client can pass the
+last seq it saw and have the gap replayed before live events resume.
+
+The same ring backs the cursor-based SSE and long-poll channels: those
+clients read straight from history and just await a shared wake-up, so an
+idle one costs no queue and no work per event.
+
+WebSocket clients choose JSON or MessagePack when they connect. JSON
+clients always get one message per frame. MessagePack clients get the
+messages published within one event-loop tick as a single frame. Each
+message is encoded at most once per format, however many clients share it.
+"""
+import asyncio
+import itertools
+from collections import deque
+import logging
+import time
+from typing import AsyncIterator, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .encoding import FORMATS, encode, pack_batch
+from .metrics import EVENT_SEND_LAG_SECONDS, EVENTS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+
+class EncodedEvent:
+    """A message and its wire encodings, each built on first use"""
+    
+    __slots__ = ("message", "seq", "_encoded")
+    
+    def __init__(self, message: dict, seq: Optional[int] = None):
+        self.message = message
+        self.seq = seq
+        self._encoded: dict[str, Union[str, bytes]] = {}
+    
+    def encode(self, fmt: str) -> Union[str, bytes]:
+        encoded = self._encoded.get(fmt)
+        if encoded is None:
+            encoded = self._encoded[fmt] = encode(self.message, fmt)
+        return encoded
+
+
+class EventBatch:
+    """Events published in one event-loop tick, queued to WebSocket clients together"""
+    
+    __slots__ = ("events", "published_at", "_packed")
+    
+    def __init__(self, events: list[EncodedEvent], published_at: float):
+        self.events = events
+        self.published_at = published_at  # When the first event was published
+        self._packed: Optional[bytes] = None
+    
+    def frames(self, fmt: str) -> list[Union[str, bytes]]:
+        """
+        Wire frames for a client format: msgpack clients get the whole batch
+        as one frame, JSON clients one frame per event (unchanged protocol).
+        """
+        if fmt != "msgpack":
+            return [event.encode(fmt) for event in self.events]
+        if self._packed is None:
+            self._packed = pack_batch([event.encode(fmt) for event in self.events])
+        return [self._packed]
+
+
+class EventClient:
+    """One connected /events socket and its outgoing queue"""
+    
+    def __init__(self, client_id: int, websocket: WebSocket, max_queue: int, fmt: str = "json"):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.format = fmt
+        self.peer = f"{websocket.client.host}:{websocket.client.port}" if websocket.client else "unknown"
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.connected_at = time.monotonic()
+        self.sender: Optional[asyncio.Task] = None
+        self.backlog: Optional[EventBatch] = None  # Replay, sent before the queue
+        
+        self.sent = 0
+        self.dropped = 0
+        self.overflowed = False  # Set when the disconnect policy kicks in
+        self.lag_last = 0.0
+        self.lag_avg = 0.0
+        self.lag_max = 0.0
+    
+    def record_lag(self, lag: float, events: int = 1):
+        self.lag_last = lag
+        self.lag_avg = lag if self.sent == 0 else self.lag_avg * 0.9 + lag * 0.1
+        self.lag_max = max(self.lag_max, lag)
+        self.sent += events
+
+
+class EventBroadcaster:
+    """
+    Bounded per-client fan-out for /events.
+    
+    Overflow policies:
+    - "drop_oldest": discard the client's oldest queued message to make room
+    - "disconnect": close a client that falls a full queue behind
+    """
+    
+    POLICIES = ("drop_oldest", "disconnect")
+    
+    def __init__(
+        self,
+        max_queue: int = 64,
+        policy: str = "drop_oldest",
+        ping_interval: float = 1.0,
+        history_size: int = 256
+    ):
+        """
+        Args:
+            max_queue: Frames queued per client before the overflow policy applies
+            policy: Overflow policy (see POLICIES)
+            ping_interval: Shared keep-alive period (seconds), 0 = off
+            history_size: Recent events kept for replay on reconnect
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        
+        self.max_queue = max_queue
+        self.policy = policy
+        self.ping_interval = ping_interval
+        
+        self.clients: dict[int, EventClient] = {}
+        self._ids = itertools.count(1)
+        self._ping_task: Optional[asyncio.Task] = None
+        
+        self.events_published = 0
+        self.batches_published = 0
+        self.last_seq = 0
+        self.history: deque[EncodedEvent] = deque(maxlen=history_size)
+        self._new_event = asyncio.Event()  # Replaced after every replayable publish
+        
+        # Events published this tick, flushed to WebSocket clients together
+        self._pending: list[EncodedEvent] = []
+        self._pending_since = 0.0
+    
+    def publish(self, message: dict, replayable: bool = True):
+        """
+        Queue an event for every client (never blocks).
+        
+        Args:
+            message: Event to send
+            replayable: Stamp a sequence number and keep it for replay (False for pings)
+        """
+        if replayable:
+            self.last_seq += 1
+            event = EncodedEvent({**message, "seq": self.last_seq}, self.last_seq)
+            self.history.append(event)
+            self._new_event.set()
+            self._new_event = asyncio.Event()
+        else:
+            event = EncodedEvent(message)
+        
+        self.events_published += 1
+        if not self.clients:
+            return
+        
+        if not self._pending:
+            self._pending_since = time.monotonic()
+            try:
+                asyncio.get_running_loop().call_soon(self._flush)
+            except RuntimeError:
+                self._pending.append(event)  # No loop running - send immediately
+                self._flush()
+                return
+        self._pending.append(event)
+    
+    def _flush(self):
+        """Queue this tick's events to every WebSocket client as one batch"""
+        if not self._pending:
+            return
+        
+        batch = EventBatch(self._pending, self._pending_since)
+        self._pending = []
+        self.batches_published += 1
+        
+        for client in list(self.clients.values()):
+            self._enqueue(client, batch)
+    
+    def _enqueue(self, client: EventClient, item: EventBatch):
+        """Put on a client's queue, applying the overflow policy"""
+        try:
+            client.queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        
+        if self.policy == "disconnect":
+            if not client.overflowed:
+                logger.warning(f"Event client {client.peer} fell {self.max_queue} messages behind - disconnecting")
+                client.overflowed = True
+                if client.sender is not None:
+                    client.sender.cancel()  # Ends serve(), which closes the socket
+            client.dropped += len(item.events)
+            EVENTS_DROPPED.inc("disconnect", amount=len(item.events))
+            return
+        
+        dropped = client.queue.get_nowait()
+        client.queue.put_nowait(item)
+        client.dropped += len(dropped.events)
+        EVENTS_DROPPED.inc("drop_oldest", amount=len(dropped.events))
+    
+    def replay_since(self, since: int) -> tuple[list[EncodedEvent], bool]:
+        """
+        Retained events after a sequence number.
+        
+        A since ahead of last_seq means the service restarted (sequence
+        reset), so everything retained is replayed.
+        
+        Returns:
+            (events, complete) - complete is False if events after since
+            have already left the history
+        """
+        if since > self.last_seq:
+            since = 0
+        
+        if not self.history:
+            return [], since >= self.last_seq
+        
+        oldest = self.history[0].seq
+        start = max(0, since + 1 - oldest)  # Sequence numbers are contiguous
+        return list(itertools.islice(self.history, start, None)), since + 1 >= oldest
+    
+    def gap_notice(self, since: int) -> EncodedEvent:
+        """Message telling a client that events after since were lost"""
+        oldest = self.history[0].seq if self.history else None
+        return EncodedEvent({"type": "replay_incomplete", "since": since, "oldest": oldest})
+    
+    async def wait_since(self, since: int, timeout: float) -> tuple[list[EncodedEvent], bool]:
+        """
+        Events after since, waiting up to timeout for one if there are none yet.
+        
+        Returns:
+            Same as replay_since (empty on timeout)
+        """
+        events, complete = self.replay_since(since)
+        if events or not complete:
+            return events, complete
+        
+        try:
+            await asyncio.wait_for(self._new_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], True
+        return self.replay_since(since)
+    
+    async def sse(self, since: Optional[int], keepalive: float = 15.0) -> AsyncIterator[str]:
+        """
+        Server-sent events body: every event after since (live only if None).
+        
+        Each event's id is its seq, so EventSource reconnects resume via
+        Last-Event-ID. A comment line goes out after keepalive seconds idle.
+        """
+        cursor = self.last_seq if since is None else since
+        yield "retry: 1000\n\n"
+        
+        while True:
+            events, complete = await self.wait_since(cursor, keepalive)
+            
+            if not complete:
+                yield f"data: {self.gap_notice(cursor).encode('json')}\n\n"
+            
+            if events:
+                yield "".join(f"id: {event.seq}\ndata: {event.encode('json')}\n\n" for event in events)
+                cursor = events[-1].seq
+            elif not complete:
+                cursor = self.last_seq  # Nothing retained to resume from
+            else:
+                yield ": keepalive\n\n"
+    
+    async def serve(self, websocket: WebSocket, since: Optional[int] = None, fmt: str = "json"):
+        """
+        Run one accepted /events connection until it closes.
+        
+        Args:
+            websocket: Accepted socket
+            since: Last seq the client saw - missed events are replayed first
+            fmt: Wire format negotiated for this client (see encoding.FORMATS)
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown event format: {fmt}")
+        
+        client = EventClient(next(self._ids), websocket, self.max_queue, fmt)
+        
+        # Flush this tick's events to existing clients, then snapshot the replay
+        # and register in one step (no await between), so every event lands in
+        # exactly one of backlog or queue
+        self._flush()
+        if since is not None:
+            events, complete = self.replay_since(since)
+            if not complete:
+                events = [self.gap_notice(since)] + events
+            if events:
+                client.backlog = EventBatch(events, time.monotonic())
+        
+        self.clients[client.client_id] = client
+        logger.info(f"WebSocket connected ({client.peer}). Active connections: {len(self.clients)}")
+        
+        sender = client.sender = asyncio.create_task(self._send_loop(client))
+        receiver = asyncio.create_task(self._receive_loop(client))
+        
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, receiver):
+                task.cancel()
+            self.clients.pop(client.client_id, None)
+            
+            if client.overflowed:
+                try:
+                    await websocket.close(code=1013)  # Try again later
+                except Exception:
+                    pass
+            
+            logger.info(f"WebSocket disconnected ({client.peer}). Active connections: {len(self.clients)}")
+    
+    async def _send_loop(self, client: EventClient):
+        """Send a client's replay backlog, then drain its queue onto its socket"""
+        while True:
+            if client.backlog is not None:
+                batch, client.backlog = client.backlog, None
+            else:
+                batch = await client.queue.get()
+            
+            try:
+                for frame in batch.frames(client.format):
+                    if isinstance(frame, bytes):
+                        await client.websocket.send_bytes(frame)
+                    else:
+                        await client.websocket.send_text(frame)
+            except Exception as e:
+                logger.warning(f"Failed to send to WebSocket {client.peer}: {e}")
+                return
+            
+            lag = time.monotonic() - batch.published_at
+            client.record_lag(lag, len(batch.events))
+            EVENT_SEND_LAG_SECONDS.observe(lag)
+    
+    async def _receive_loop(self, client: EventClient):
+        """Consume (and ignore) client messages so disconnects are noticed while idle"""
+        try:
+            while True:
+                message = await client.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+        except (WebSocketDisconnect, RuntimeError):
+            return  # Closed (Starlette raises RuntimeError on receive after a disconnect)
+        except Exception as e:
+            logger.warning(f"WebSocket receive failed ({client.peer}): {e}")
+        finally:
+            # Stop queueing events for it right away (serve() also cleans up)
+            self.clients.pop(client.client_id, None)
+    
+    async def _ping_loop(self):
+        """One shared keep-alive for all clients"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            if self.clients:
+                self.publish({"type": "ping", "lastSeq": self.last_seq}, replayable=False)
+    
+    def start(self):
+        """Start the shared ping task (call from the running event loop)"""
+        if self._ping_task is None and self.ping_interval > 0:
+            self._ping_task = asyncio.create_task(self._ping_loop())
+    
+    def stop(self):
+        """Stop the shared ping task"""
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+    
+    def get_stats(self) -> dict:
+        """Per-client queue depth, drops and send lag"""
+        now = time.monotonic()
+        return {
+            "policy": self.policy,
+            "max_queue": self.max_queue,
+            "events_published": self.events_published,
+            "batches_published": self.batches_published,
+            "last_seq": self.last_seq,
+            "history": len(self.history),
+            "clients": [
+                {
+                    "id": client.client_id,
+                    "peer": client.peer,
+                    "format": client.format,
+                    "connected_s": round(now - client.connected_at, 1),
+                    "queued": client.queue.qsize(),
+                    "sent": client.sent,
+                    "dropped": client.dropped,
+                    "lag_ms": {
+                        "last": round(client.lag_last * 1000, 2),
+                        "avg": round(client.lag_avg * 1000, 2),
+                        "max": round(client.lag_max * 1000, 2)
+                    }
+                }
+                for client in self.clients.values()
+            ]
+        }
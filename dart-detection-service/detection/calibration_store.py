@@ -0,0 +1,344 @@
+"""
+Calibration Store
+Versioned SQLite persistence for click calibrations.
+
+Every calibration is appended to a history table, and a small table points
+each camera at its active version, so rolling back is a pointer update.
+The history is mirrored in memory, so saves, rollbacks and lookups answer
+immediately. Writes are queued to a background thread that owns one
+long-lived WAL-mode connection and commits everything queued in a single
+transaction, so the request path never waits on an SD-card fsync.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MATRIX_DTYPE = np.dtype("<f8")  # Blob layout: 9 little-endian float64, row-major
+
+
+@dataclass
+class CalibrationRecord:
+    """One saved calibration version"""
+    version: int
+    camera_id: int
+    center: tuple[float, float]
+    radius: float
+    transform_matrix: np.ndarray
+    target_size: tuple[int, int]
+    calibrated_at: float  # Unix time
+    
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "camera_id": self.camera_id,
+            "center": [self.center[0], self.center[1]],
+            "radius": round(self.radius, 2),
+            "target_size": list(self.target_size),
+            "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.calibrated_at))
+        }
+
+
+def matrix_to_blob(matrix: np.ndarray) -> bytes:
+    return np.ascontiguousarray(matrix, dtype=MATRIX_DTYPE).tobytes()
+
+
+def blob_to_matrix(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=MATRIX_DTYPE).reshape(3, 3).copy()
+
+
+class CalibrationStore:
+    """Calibration history with an active version per camera"""
+    
+    def __init__(self, db_path: str, max_versions: int = 20):
+        """
+        Args:
+            db_path: SQLite database file
+            max_versions: Versions kept per camera (the active one is never pruned)
+        """
+        self.db_path = db_path
+        self.max_versions = max_versions
+        
+        self.history: dict[int, list[CalibrationRecord]] = {}  # camera -> oldest first
+        self.active: dict[int, int] = {}  # camera -> version
+        
+        self.writes_queued = 0
+        self.writes_committed = 0
+        self.write_errors = 0
+        
+        self._next_version = 1
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        
+        try:
+            self._open()
+            self._load()
+        except Exception as e:
+            logger.error(f"Failed to open calibration database (calibrations will not persist): {e}")
+            self._conn = None
+            return
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="calibration-writer", daemon=True)
+        self._writer.start()
+    
+    def _open(self):
+        """Open the connection, switch to WAL and create tables"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL: fsync at checkpoints, not every commit
+        conn.execute("PRAGMA busy_timeout=5000")
+        
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS calibration_history (
+                version INTEGER PRIMARY KEY,
+                camera_id INTEGER NOT NULL,
+                center_x REAL NOT NULL,
+                center_y REAL NOT NULL,
+                radius REAL NOT NULL,
+                transform_matrix BLOB NOT NULL,
+                target_width INTEGER NOT NULL,
+                target_height INTEGER NOT NULL,
+                calibrated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS calibration_history_camera
+                ON calibration_history (camera_id, version);
+            CREATE TABLE IF NOT EXISTS active_calibration (
+                camera_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+        ''')
+        self._conn = conn
+        self._migrate_legacy()
+        logger.info(f"Calibration database initialized at {self.db_path}")
+    
+    def _migrate_legacy(self):
+        """Import the old single-row-per-camera table (JSON matrix) as version history"""
+        conn = self._conn
+        legacy = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'camera_calibration'"
+        ).fetchone()
+        if legacy is None or conn.execute("SELECT 1 FROM calibration_history LIMIT 1").fetchone():
+            return
+        
+        rows = conn.execute(
+            "SELECT camera_id, center_x, center_y, radius, transform_matrix FROM camera_calibration ORDER BY camera_id"
+        ).fetchall()
+        with conn:
+            for version, (camera_id, center_x, center_y, radius, matrix_json) in enumerate(rows, start=1):
+                matrix = np.array(json.loads(matrix_json), dtype=np.float64)
+                # The old table did not record the target size - the calibrator
+                # rebuilds the matrix from the geometry when it doesn't match
+                conn.execute(
+                    "INSERT INTO calibration_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (version, camera_id, center_x, center_y, radius, matrix_to_blob(matrix), 0, 0, time.time())
+                )
+                conn.execute("INSERT INTO active_calibration VALUES (?, ?)", (camera_id, version))
+        
+        if rows:
+            logger.info(f"Migrated {len(rows)} calibration(s) from the legacy table")
+    
+    def _load(self):
+        """Mirror the history and active versions in memory"""
+        rows = self._conn.execute('''
+            SELECT version, camera_id, center_x, center_y, radius, transform_matrix,
+                   target_width, target_height, calibrated_at
+            FROM calibration_history ORDER BY version
+        ''').fetchall()
+        
+        for version, camera_id, center_x, center_y, radius, blob, width, height, calibrated_at in rows:
+            self.history.setdefault(camera_id, []).append(CalibrationRecord(
+                version=version,
+                camera_id=camera_id,
+                center=(center_x, center_y),
+                radius=radius,
+                transform_matrix=blob_to_matrix(blob),
+                target_size=(width, height),
+                calibrated_at=calibrated_at
+            ))
+            self._next_version = max(self._next_version, version + 1)
+        
+        self.active = dict(self._conn.execute("SELECT camera_id, version FROM active_calibration").fetchall())
+    
+    def _submit(self, *statements: tuple[str, tuple]):
+        """Queue statements to commit together on the writer thread"""
+        if self._writer is None:
+            return
+        self.writes_queued += 1
+        self._queue.put(statements)
+    
+    def _writer_loop(self):
+        """Commit queued writes, one transaction for everything waiting"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            writes = [item for item in batch if isinstance(item, tuple)]
+            if writes:
+                try:
+                    with self._conn:
+                        for statements in writes:
+                            for sql, params in statements:
+                                self._conn.execute(sql, params)
+                    self.writes_committed += len(writes)
+                except Exception as e:
+                    self.write_errors += len(writes)
+                    logger.error(f"Failed to write calibration changes: {e}")
+            
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()  # flush() marker - everything queued before it is committed
+            
+            if None in batch:
+                return
+    
+    def active_records(self) -> list[CalibrationRecord]:
+        """Active calibration of every calibrated camera"""
+        with self._lock:
+            return [
+                record
+                for camera_id, version in self.active.items()
+                for record in self.history.get(camera_id, [])
+                if record.version == version
+            ]
+    
+    def save(
+        self,
+        camera_id: int,
+        center: tuple[float, float],
+        radius: float,
+        transform_matrix: np.ndarray,
+        target_size: tuple[int, int]
+    ) -> CalibrationRecord:
+        """
+        Record a new calibration version and make it active (never blocks on disk).
+        
+        Returns:
+            The new record
+        """
+        with self._lock:
+            record = CalibrationRecord(
+                version=self._next_version,
+                camera_id=camera_id,
+                center=(float(center[0]), float(center[1])),
+                radius=float(radius),
+                transform_matrix=np.array(transform_matrix, dtype=np.float64),
+                target_size=(int(target_size[0]), int(target_size[1])),
+                calibrated_at=time.time()
+            )
+            self._next_version += 1
+            
+            versions = self.history.setdefault(camera_id, [])
+            versions.append(record)
+            self.active[camera_id] = record.version
+            pruned = self._prune(camera_id)
+        
+        self._submit(
+            (
+                "INSERT INTO calibration_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.version, camera_id, record.center[0], record.center[1], record.radius,
+                    matrix_to_blob(record.transform_matrix), record.target_size[0], record.target_size[1],
+                    record.calibrated_at
+                )
+            ),
+            ("INSERT OR REPLACE INTO active_calibration VALUES (?, ?)", (camera_id, record.version)),
+            *(("DELETE FROM calibration_history WHERE version = ?", (version,)) for version in pruned)
+        )
+        return record
+    
+    def _prune(self, camera_id: int) -> list[int]:
+        """Drop the oldest inactive versions beyond max_versions (lock held)"""
+        versions = self.history[camera_id]
+        active = self.active.get(camera_id)
+        pruned = []
+        
+        while len(versions) > self.max_versions:
+            oldest = next((record for record in versions if record.version != active), None)
+            if oldest is None:
+                break
+            versions.remove(oldest)
+            pruned.append(oldest.version)
+        return pruned
+    
+    def activate(self, camera_id: int, version: int) -> Optional[CalibrationRecord]:
+        """
+        Make an earlier version the active one (rollback).
+        
+        Returns:
+            The activated record, or None if the camera has no such version
+        """
+        with self._lock:
+            record = next((r for r in self.history.get(camera_id, []) if r.version == version), None)
+            if record is None:
+                return None
+            self.active[camera_id] = version
+        
+        self._submit(("INSERT OR REPLACE INTO active_calibration VALUES (?, ?)", (camera_id, version)))
+        return record
+    
+    def deactivate(self, camera_id: int):
+        """Clear a camera's active calibration (its history is kept for rollback)"""
+        with self._lock:
+            if self.active.pop(camera_id, None) is None:
+                return
+        
+        self._submit(("DELETE FROM active_calibration WHERE camera_id = ?", (camera_id,)))
+    
+    def get_history(self, camera_id: int) -> list[dict]:
+        """A camera's saved versions, newest first"""
+        with self._lock:
+            active = self.active.get(camera_id)
+            return [
+                {**record.to_dict(), "active": record.version == active}
+                for record in reversed(self.history.get(camera_id, []))
+            ]
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued write is committed.
+        
+        Returns:
+            False if the timeout expired first
+        """
+        if self._writer is None:
+            return True
+        
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self):
+        """Commit outstanding writes and close the connection"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def get_stats(self) -> dict:
+        return {
+            "persistent": self._conn is not None,
+            "pending_writes": self.writes_queued - self.writes_committed - self.write_errors,
+            "writes_queued": self.writes_queued,
+            "writes_committed": self.writes_committed,
+            "write_errors": self.write_errors
+        }
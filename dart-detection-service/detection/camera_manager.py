@@ -3,33 +3,243 @@ Camera Manager
 Handles camera access and configuration for dart detection.
 """
 import cv2
+import numpy as np
 import logging
+import threading
+import time
+from pathlib import Path
 from typing import Optional
+from dataclasses import dataclass
+
+from .metrics import STAGE_SECONDS, FRAMES_CAPTURED
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CapturedFrame:
+    """Most recent frame read from a camera"""
+    frame: np.ndarray
+    timestamp: float  # time.monotonic() when the read returned
+    sequence: int     # Increments with every successful read
+
+
+@dataclass
+class CameraDevice:
+    """Camera device in the inventory"""
+    index: int
+    name: str
+    device: str
+    in_use: bool  # Held open by this service
+
+
+class CaptureThread(threading.Thread):
+    """
+    Reads one camera continuously in the background.
+    
+    Only the newest frame is kept, so readers never block on V4L2
+    and never see a backlog of stale frames.
+    
+    If stop() gives up waiting while a read is stuck, the thread takes
+    over the capture and releases it once the read returns.
+    """
+    
+    def __init__(self, index: int, capture: cv2.VideoCapture):
+        super().__init__(name=f"camera-{index}", daemon=True)
+        self.index = index
+        self.capture = capture
+        
+        self._lock = threading.Lock()
+        self._latest: Optional[CapturedFrame] = None
+        self._sequence = 0
+        self._stop_event = threading.Event()
+        self._first_frame = threading.Event()
+        self._exited = False
+        self._release_on_exit = False
+    
+    def run(self):
+        """Capture loop - overwrites the latest-frame slot on every read"""
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.capture.read()
+            timestamp = time.monotonic()
+            STAGE_SECONDS.observe_since(start, "capture")
+            
+            if not ret:
+                # Device hiccup - back off briefly instead of spinning
+                self._stop_event.wait(0.01)
+                continue
+            
+            self._sequence += 1
+            FRAMES_CAPTURED.inc(self.index)
+            with self._lock:
+                self._latest = CapturedFrame(frame, timestamp, self._sequence)
+            self._first_frame.set()
+        
+        with self._lock:
+            self._exited = True
+            release = self._release_on_exit
+        if release:
+            self.capture.release()
+            logger.info(f"Released camera {self.index} after its capture thread exited")
+    
+    def latest(self) -> Optional[CapturedFrame]:
+        """Get the newest frame without blocking on the camera"""
+        with self._lock:
+            return self._latest
+    
+    def wait_for_frame(self, timeout: float = 1.0) -> bool:
+        """Block until the first frame has been captured"""
+        return self._first_frame.wait(timeout)
+    
+    def stop(self, timeout: float = 1.0) -> bool:
+        """
+        Stop capturing and wait for the thread to exit.
+        
+        Returns:
+            True if the thread exited. Otherwise it is still in a read and
+            now owns the capture: it releases it when the read returns.
+        """
+        self._stop_event.set()
+        self.join(timeout)
+        with self._lock:
+            if self._exited:
+                return True
+            self._release_on_exit = True
+            return False
+
+
 class CameraManager:
-    """Manages camera devices and their configuration"""
+    """
+    Manages camera devices and their configuration.
+    
+    The device inventory is cached and rebuilt at most every
+    inventory_ttl seconds. On Linux it comes from the V4L2 nodes of
+    capture drivers (CAPTURE_DRIVERS) in sysfs, which are listed without
+    opening any device. Elsewhere, free indices
+    are probed with VideoCapture. Cameras this manager holds open always
+    count as present.
+    
+    Device opens (capture threads, one-off snapshots, probes) go through
+    a per-device lock, so a snapshot never races the detector for a camera.
+    """
     
-    def __init__(self):
+    SYSFS_VIDEO = Path("/sys/class/video4linux")
+    
+    # Kernel drivers of capture devices. Other V4L2 nodes (the Pi's
+    # bcm2835-codec and ISP, decoders, ...) are not cameras
+    CAPTURE_DRIVERS = {"uvcvideo"}
+    
+    def __init__(self, inventory_ttl: float = 5.0):
         self.cameras: dict[int, cv2.VideoCapture] = {}
+        self.capture_threads: dict[int, CaptureThread] = {}
+        
+        self.inventory_ttl = inventory_ttl
+        self._inventory: dict[int, str] = {}  # index -> device name
+        self._inventory_time: Optional[float] = None
+        self._inventory_lock = threading.Lock()
+        
+        self._device_locks: dict[int, threading.Lock] = {}
+        self._device_locks_lock = threading.Lock()
     
-    def get_available_cameras(self, max_index: int = 10) -> list[int]:
+    def _device_lock(self, index: int) -> threading.Lock:
+        """Lock serializing opens of one device"""
+        with self._device_locks_lock:
+            return self._device_locks.setdefault(index, threading.Lock())
+    
+    def _scan_sysfs(self, max_index: int) -> Optional[dict[int, str]]:
         """
-        Scan for available camera devices.
-        Returns list of camera indices that can be opened.
+        List V4L2 capture devices from sysfs without opening them.
+        
+        Args:
+            max_index: Highest index (exclusive) to report, as for the probe
+        
+        Returns:
+            {index: name}, or None if sysfs is not available
         """
-        available = []
+        if not self.SYSFS_VIDEO.is_dir():
+            return None
+        
+        devices = {}
+        for node in self.SYSFS_VIDEO.glob("video*"):
+            try:
+                index = int(node.name[len("video"):])
+            except ValueError:
+                continue
+            if index >= max_index:
+                continue
+            
+            if (node / "device" / "driver").resolve().name not in self.CAPTURE_DRIVERS:
+                continue
+            
+            # UVC cameras expose a second (metadata) node per device - keep the first
+            try:
+                if int((node / "index").read_text().strip()) != 0:
+                    continue
+            except (OSError, ValueError):
+                pass
+            
+            try:
+                name = (node / "name").read_text().strip()
+            except OSError:
+                name = f"Camera {index}"
+            devices[index] = name
         
+        return devices
+    
+    def _probe_devices(self, max_index: int) -> dict[int, str]:
+        """Fallback: open each free index briefly (slow, skips cameras in use)"""
+        devices = {}
         for i in range(max_index):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available.append(i)
+            with self._device_lock(i):
+                if i in self.cameras:
+                    continue
+                cap = cv2.VideoCapture(i)
+                if cap.isOpened():
+                    devices[i] = f"Camera {i}"
                 cap.release()
+        return devices
+    
+    def get_camera_inventory(self, max_index: int = 10, refresh: bool = False) -> list[CameraDevice]:
+        """
+        Cached list of camera devices, including the ones open here.
         
-        logger.info(f"Found {len(available)} available cameras: {available}")
-        return available
+        Blocking when the cache is stale and the probe fallback runs -
+        call from a worker thread.
+        
+        Args:
+            max_index: Highest index (exclusive) listed or probed
+            refresh: Rebuild the inventory even if the cache is fresh
+        """
+        with self._inventory_lock:
+            now = time.monotonic()
+            stale = self._inventory_time is None or now - self._inventory_time > self.inventory_ttl
+            
+            if refresh or stale:
+                devices = self._scan_sysfs(max_index)
+                if devices is None:
+                    devices = self._probe_devices(max_index)
+                
+                if devices.keys() != self._inventory.keys():
+                    logger.info(f"Camera inventory: {sorted(devices)}")
+                self._inventory = devices
+                self._inventory_time = now
+            
+            inventory = dict(self._inventory)
+        
+        for index in self.cameras:
+            inventory.setdefault(index, f"Camera {index}")
+        
+        return [
+            CameraDevice(index, name, f"/dev/video{index}", index in self.cameras)
+            for index, name in sorted(inventory.items())
+        ]
+    
+    def get_available_cameras(self, max_index: int = 10) -> list[int]:
+        """
+        Camera indices that are present (cached, may block - see get_camera_inventory).
+        """
+        return [device.index for device in self.get_camera_inventory(max_index)]
     
     def open_camera(self, index: int, width: int = 640, height: int = 480, fps: int = 30) -> cv2.VideoCapture:
         """
@@ -44,39 +254,109 @@ class CameraManager:
         Returns:
             VideoCapture object
         """
-        if index in self.cameras:
-            logger.warning(f"Camera {index} already open")
-            return self.cameras[index]
-        
-        logger.info(f"Opening camera {index} at {width}x{height} @ {fps}fps")
-        
-        cap = cv2.VideoCapture(index)
+        # Held until the capture thread is registered, so a one-off snapshot
+        # either finishes before we open the device or sees the thread after
+        with self._device_lock(index):
+            if index in self.cameras:
+                logger.warning(f"Camera {index} already open")
+                return self.cameras[index]
+            
+            logger.info(f"Opening camera {index} at {width}x{height} @ {fps}fps")
+            
+            cap = cv2.VideoCapture(index)
+            
+            if not cap.isOpened():
+                cap.release()
+                raise RuntimeError(f"Failed to open camera {index}")
+            
+            # Set resolution
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            cap.set(cv2.CAP_PROP_FPS, fps)
+            
+            # Try to reduce exposure for better dart detection
+            # (lower exposure = less motion blur)
+            cap.set(cv2.CAP_PROP_EXPOSURE, -6)  # Manual exposure
+            
+            # Verify settings
+            actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            actual_fps = int(cap.get(cv2.CAP_PROP_FPS))
+            
+            logger.info(f"Camera {index} opened: {actual_width}x{actual_height} @ {actual_fps}fps")
+            
+            self.cameras[index] = cap
+            
+            # Start background capture into the latest-frame slot
+            thread = CaptureThread(index, cap)
+            thread.start()
+            self.capture_threads[index] = thread
         
-        if not cap.isOpened():
-            raise RuntimeError(f"Failed to open camera {index}")
+        return cap
+    
+    def get_latest_frame(self, index: int) -> Optional[CapturedFrame]:
+        """
+        Get the newest captured frame for a camera without blocking.
         
-        # Set resolution
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        cap.set(cv2.CAP_PROP_FPS, fps)
+        Returns:
+            CapturedFrame, or None if camera not open or no frame captured yet
+        """
+        thread = self.capture_threads.get(index)
+        if thread is None:
+            return None
         
-        # Try to reduce exposure for better dart detection
-        # (lower exposure = less motion blur)
-        cap.set(cv2.CAP_PROP_EXPOSURE, -6)  # Manual exposure
+        return thread.latest()
+    
+    def grab_frame(self, index: int, width: int = 640, height: int = 480, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        Get a single frame, e.g. for the calibration UI (blocking - call from a worker thread).
         
-        # Verify settings
-        actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        actual_fps = int(cap.get(cv2.CAP_PROP_FPS))
+        Uses the latest frame from the running capture when the camera is
+        open here. Only opens the device when nobody holds it, and then
+        only briefly and under the device lock.
         
-        logger.info(f"Camera {index} opened: {actual_width}x{actual_height} @ {actual_fps}fps")
+        Args:
+            index: Camera device index
+            width, height: Resolution for a one-off open
+            timeout: How long to wait for a just-opened capture's first frame
+            
+        Returns:
+            BGR frame, or None if no frame could be read
+        """
+        if index not in self.capture_threads:
+            with self._device_lock(index):
+                if index not in self.capture_threads:
+                    cap = cv2.VideoCapture(index)
+                    try:
+                        if not cap.isOpened():
+                            return None
+                        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                        ret, frame = cap.read()
+                        return frame if ret else None
+                    finally:
+                        cap.release()
         
-        self.cameras[index] = cap
-        return cap
+        # Opened by the detector (possibly while we waited for the lock)
+        thread = self.capture_threads.get(index)
+        if thread is None:
+            return None
+        thread.wait_for_frame(timeout)
+        captured = thread.latest()
+        return captured.frame if captured is not None else None
+    
+    def wait_for_frames(self, timeout: float = 1.0) -> bool:
+        """Block until every open camera has captured at least one frame"""
+        deadline = time.monotonic() + timeout
+        for thread in self.capture_threads.values():
+            remaining = max(0.0, deadline - time.monotonic())
+            if not thread.wait_for_frame(remaining):
+                return False
+        return True
     
     def read_frame(self, index: int) -> Optional[tuple[bool, any]]:
         """
-        Read a frame from the specified camera.
+        Read the latest frame from the specified camera.
         
         Returns:
             (success, frame) tuple, or None if camera not open
@@ -85,14 +365,24 @@ class CameraManager:
             logger.error(f"Camera {index} not open")
             return None
         
-        return self.cameras[index].read()
+        captured = self.get_latest_frame(index)
+        if captured is None:
+            return False, None
+        
+        return True, captured.frame
     
     def release_camera(self, index: int):
         """Release a specific camera"""
-        if index in self.cameras:
-            self.cameras[index].release()
-            del self.cameras[index]
-            logger.info(f"Released camera {index}")
+        with self._device_lock(index):
+            thread = self.capture_threads.pop(index, None)
+            handed_off = thread is not None and not thread.stop()
+            if handed_off:
+                logger.warning(f"Camera {index} capture thread did not stop in time - it will release the device when its read returns")
+            
+            cap = self.cameras.pop(index, None)
+            if cap is not None and not handed_off:
+                cap.release()
+                logger.info(f"Released camera {index}")
     
     def release_all(self):
         """Release all cameras"""
@@ -103,6 +393,10 @@ class CameraManager:
     def is_camera_open(self, index: int) -> bool:
         """Check if a camera is currently open"""
         return index in self.cameras and self.cameras[index].isOpened()
+    
+    def is_exhausted(self) -> bool:
+        """Live cameras never run out of frames (see ReplayCameraManager)"""
+        return False
 
 
 class CameraCalibration:
@@ -7,12 +7,14 @@ import cv2
 import numpy as np
 import logging
 import math
-import sqlite3
-import json
 from pathlib import Path
 from typing import Optional, Tuple
 from dataclasses import dataclass
 
+from .artifact_cache import ArtifactCache, artifact_key
+from .calibration_store import CalibrationRecord, CalibrationStore
+from .score_calculator import ScoreCalculator
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +24,7 @@ class CalibrationResult:
     success: bool
     message: str
     transform_matrix: Optional[np.ndarray] = None
+    version: Optional[int] = None
 
 
 class ClickCalibrator:
@@ -31,16 +34,24 @@ class ClickCalibrator:
     2. Outer double at 12 o'clock (top)
     3. Outer double at 3 o'clock (right)
     
-    Stores calibration in SQLite database for persistence.
+    Stores calibration in SQLite database for persistence, keeping earlier
+    versions for rollback.
     """
     
-    def __init__(self, target_size: Tuple[int, int] = (800, 800), db_path: str = "/home/pi/mydarts_calibration.db"):
+    def __init__(
+        self,
+        target_size: Tuple[int, int] = (800, 800),
+        db_path: str = "/home/pi/mydarts_calibration.db",
+        artifact_dir: Optional[str] = None
+    ):
         """
         Initialize calibrator.
         
         Args:
             target_size: Size of the transformed output image
             db_path: Path to SQLite database for storing calibration
+            artifact_dir: Where precomputed remap/score tables are kept
+                          (default: mydarts_artifacts next to the database)
         """
         self.target_size = target_size
         self.db_path = db_path
@@ -48,6 +59,11 @@ class ClickCalibrator:
         # Store calibration per camera
         self.calibrations: dict[int, dict] = {}
         
+        # Fixed-point remap tables per camera (memory-mapped from the artifact
+        # cache, or built from the matrix, on first use)
+        self._remap_cache: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self.artifacts = ArtifactCache(artifact_dir or str(Path(db_path).parent / "mydarts_artifacts"))
+        
         # Board center in transformed space
         self.board_center = (target_size[0] // 2, target_size[1] // 2)
         
@@ -65,98 +81,78 @@ class ClickCalibrator:
             'bull_inner': int(7 * scale_factor)
         }
         
-        # Initialize database
-        self._init_database()
+        # Versioned persistence (writes happen on a background thread)
+        self.store = CalibrationStore(db_path)
         
         # Load existing calibrations
         self._load_all_calibrations()
     
-    def _init_database(self):
-        """Create database and table if they don't exist"""
-        try:
-            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS camera_calibration (
-                    camera_id INTEGER PRIMARY KEY,
-                    center_x INTEGER NOT NULL,
-                    center_y INTEGER NOT NULL,
-                    radius REAL NOT NULL,
-                    transform_matrix TEXT NOT NULL,
-                    calibrated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"Calibration database initialized at {self.db_path}")
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
-    
-    def _save_calibration(self, camera_id: int):
-        """Save calibration to database"""
-        if camera_id not in self.calibrations:
-            return
+    def _apply(self, camera_id: int, record: CalibrationRecord):
+        """Make a stored calibration the live one for a camera"""
+        transform_matrix = record.transform_matrix
+        if record.target_size != self.target_size:
+            # Stored for a different target size (or a migrated row that
+            # didn't record one) - rebuild from the clicked geometry
+            transform_matrix = self._compute_transform(record.center[0], record.center[1], record.radius)
         
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            calib = self.calibrations[camera_id]
-            
-            # Convert numpy array to JSON string
-            matrix_json = json.dumps(calib['transform_matrix'].tolist())
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO camera_calibration 
-                (camera_id, center_x, center_y, radius, transform_matrix)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                camera_id,
-                int(calib['center'][0]),
-                int(calib['center'][1]),
-                float(calib['radius']),
-                matrix_json
-            ))
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"Calibration saved for camera {camera_id}")
-        except Exception as e:
-            logger.error(f"Failed to save calibration: {e}")
+        self.calibrations[camera_id] = {
+            'transform_matrix': transform_matrix,
+            'center': record.center,
+            'radius': record.radius,
+            'version': record.version,
+            'ring_radii': self.ring_radii,
+            'board_center': self.board_center
+        }
+        self._remap_cache.pop(camera_id, None)
     
     def _load_all_calibrations(self):
-        """Load all calibrations from database on startup"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT camera_id, center_x, center_y, radius, transform_matrix FROM camera_calibration')
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                camera_id, center_x, center_y, radius, matrix_json = row
-                
-                # Convert JSON string back to numpy array
-                matrix_list = json.loads(matrix_json)
-                transform_matrix = np.array(matrix_list, dtype=np.float32)
-                
-                self.calibrations[camera_id] = {
-                    'transform_matrix': transform_matrix,
-                    'center': (center_x, center_y),
-                    'radius': radius,
-                    'ring_radii': self.ring_radii,
-                    'board_center': self.board_center
-                }
-                
-                logger.info(f"Loaded calibration for camera {camera_id}")
-            
-            conn.close()
-        except Exception as e:
-            logger.error(f"Failed to load calibrations: {e}")
+        """Load the active calibration of every camera on startup"""
+        for record in self.store.active_records():
+            self._apply(record.camera_id, record)
+            logger.info(f"Loaded calibration for camera {record.camera_id} (version {record.version})")
+    
+    def _compute_transform(self, center_x: float, center_y: float, radius: float) -> np.ndarray:
+        """
+        Perspective transform mapping the outer double square in the camera
+        view onto the full target image.
+        """
+        # Calculate 4 corners of the board square (outer double ring)
+        # Top-left
+        tl_x = center_x - radius
+        tl_y = center_y - radius
+        
+        # Top-right
+        tr_x = center_x + radius
+        tr_y = center_y - radius
+        
+        # Bottom-left
+        bl_x = center_x - radius
+        bl_y = center_y + radius
+        
+        # Bottom-right
+        br_x = center_x + radius
+        br_y = center_y + radius
+        
+        # Source points (camera view)
+        src_points = np.float32([
+            [tl_x, tl_y],  # Top-left
+            [tr_x, tr_y],  # Top-right
+            [bl_x, bl_y],  # Bottom-left
+            [br_x, br_y]   # Bottom-right
+        ])
+        
+        # Destination points (transformed view)
+        dst_points = np.float32([
+            [0, 0],                                    # Top-left
+            [self.target_size[0], 0],                  # Top-right
+            [0, self.target_size[1]],                  # Bottom-left
+            [self.target_size[0], self.target_size[1]] # Bottom-right
+        ])
+        
+        # Calculate perspective transform
+        transform_matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+        
+        return transform_matrix
     
     def calibrate_with_clicks(
         self,
@@ -194,60 +190,23 @@ class ClickCalibrator:
                     message="Radius too small - are the points correct?"
                 )
             
-            # Calculate 4 corners of the board square (outer double ring)
-            # Top-left
-            tl_x = center_x - avg_radius
-            tl_y = center_y - avg_radius
-            
-            # Top-right
-            tr_x = center_x + avg_radius
-            tr_y = center_y - avg_radius
-            
-            # Bottom-left
-            bl_x = center_x - avg_radius
-            bl_y = center_y + avg_radius
-            
-            # Bottom-right
-            br_x = center_x + avg_radius
-            br_y = center_y + avg_radius
-            
-            # Source points (camera view)
-            src_points = np.float32([
-                [tl_x, tl_y],  # Top-left
-                [tr_x, tr_y],  # Top-right
-                [bl_x, bl_y],  # Bottom-left
-                [br_x, br_y]   # Bottom-right
-            ])
-            
-            # Destination points (transformed view)
-            dst_points = np.float32([
-                [0, 0],                                    # Top-left
-                [self.target_size[0], 0],                  # Top-right
-                [0, self.target_size[1]],                  # Bottom-left
-                [self.target_size[0], self.target_size[1]] # Bottom-right
-            ])
+            transform_matrix = self._compute_transform(center_x, center_y, avg_radius)
             
-            # Calculate perspective transform
-            transform_matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+            # Store calibration (the database write is queued, not waited for)
+            record = self.store.save(camera_id, (center_x, center_y), avg_radius, transform_matrix, self.target_size)
+            self._apply(camera_id, record)
+            self._precompute_artifacts(camera_id)
             
-            # Store calibration
-            self.calibrations[camera_id] = {
-                'transform_matrix': transform_matrix,
-                'center': (center_x, center_y),
-                'radius': avg_radius,
-                'ring_radii': self.ring_radii,
-                'board_center': self.board_center
-            }
-            
-            logger.info(f"Camera {camera_id} calibrated - center: ({center_x}, {center_y}), radius: {avg_radius:.1f}px")
-            
-            # Save to database
-            self._save_calibration(camera_id)
+            logger.info(
+                f"Camera {camera_id} calibrated - center: ({center_x}, {center_y}), "
+                f"radius: {avg_radius:.1f}px (version {record.version})"
+            )
             
             return CalibrationResult(
                 success=True,
                 message=f"Camera {camera_id} calibrated successfully",
-                transform_matrix=transform_matrix
+                transform_matrix=transform_matrix,
+                version=record.version
             )
             
         except Exception as e:
@@ -257,14 +216,72 @@ class ClickCalibrator:
                 message=f"Calibration error: {str(e)}"
             )
     
+    def _remap_key(self, matrix: np.ndarray) -> str:
+        """Artifact name for the remap tables of a matrix at the current target size"""
+        return artifact_key("remap", matrix.astype(np.float64), tuple(self.target_size))
+    
+    def _build_remap(self, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Precompute fixed-point remap tables equivalent to warpPerspective.
+        
+        For every output pixel we project back through the inverse
+        homography once, so per-frame work is just a table lookup.
+        """
+        inverse = np.linalg.inv(matrix.astype(np.float64))
+        
+        width, height = self.target_size
+        xs, ys = np.meshgrid(np.arange(width, dtype=np.float64), np.arange(height, dtype=np.float64))
+        
+        denom = inverse[2, 0] * xs + inverse[2, 1] * ys + inverse[2, 2]
+        map_x = ((inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]) / denom).astype(np.float32)
+        map_y = ((inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]) / denom).astype(np.float32)
+        
+        # CV_16SC2 + interpolation table is what warpPerspective uses internally
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    
+    def _get_remap(self, camera_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """Remap tables for a camera: memory, then the artifact cache, then built and saved"""
+        maps = self._remap_cache.get(camera_id)
+        if maps is not None:
+            return maps
+        
+        matrix = self.calibrations[camera_id]['transform_matrix']
+        key = self._remap_key(matrix)
+        maps = self.artifacts.load(key, ("xy", "interp"))
+        if maps is None:
+            maps = self._build_remap(matrix)
+            self.artifacts.save(key, {"xy": maps[0], "interp": maps[1]})
+            logger.info(f"Built remap tables for camera {camera_id}")
+        
+        self._remap_cache[camera_id] = maps
+        return maps
+    
+    def _precompute_artifacts(self, camera_id: int):
+        """
+        Build and save a new calibration's remap tables and the score lookup
+        table in the background, so the next start only has to map them.
+        Remap tables no active calibration uses any more are removed.
+        """
+        matrix = self.calibrations[camera_id]['transform_matrix']
+        key = self._remap_key(matrix)
+        active = {self._remap_key(calib['transform_matrix']) for calib in self.calibrations.values()}
+        
+        def build():
+            if self.artifacts.load(key, ("xy", "interp")) is None:
+                maps = self._build_remap(matrix)
+                self.artifacts.save(key, {"xy": maps[0], "interp": maps[1]})
+            ScoreCalculator(self.board_center, self.ring_radii, artifacts=self.artifacts)
+            self.artifacts.prune("remap", active)
+        
+        self.artifacts.submit(build)
+    
     def transform_frame(self, frame: np.ndarray, camera_id: int) -> Optional[np.ndarray]:
-        """Transform frame to calibrated perspective"""
+        """Transform frame to calibrated perspective using cached remap tables"""
         if camera_id not in self.calibrations:
             return None
         
-        matrix = self.calibrations[camera_id]['transform_matrix']
-        transformed = cv2.warpPerspective(frame, matrix, self.target_size)
-        return transformed
+        maps = self._get_remap(camera_id)
+        return cv2.remap(frame, maps[0], maps[1], cv2.INTER_LINEAR)
     
     def transform_point(
         self,
@@ -320,18 +337,47 @@ class ClickCalibrator:
         return overlay
     
     def clear_calibration(self, camera_id: int):
-        """Clear calibration for specific camera"""
+        """Clear calibration for specific camera (its history is kept for rollback)"""
+        self._remap_cache.pop(camera_id, None)
+        
         if camera_id in self.calibrations:
             del self.calibrations[camera_id]
+            self.store.deactivate(camera_id)
             logger.info(f"Cleared calibration for camera {camera_id}")
+    
+    def get_history(self, camera_id: int) -> list[dict]:
+        """Saved calibration versions for a camera, newest first"""
+        return self.store.get_history(camera_id)
+    
+    def rollback(self, camera_id: int, version: int) -> CalibrationResult:
+        """
+        Make an earlier calibration version active again.
+        
+        Args:
+            camera_id: Camera identifier
+            version: Version from get_history()
             
-            # Delete from database
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM camera_calibration WHERE camera_id = ?', (camera_id,))
-                conn.commit()
-                conn.close()
-                logger.info(f"Deleted calibration from database for camera {camera_id}")
-            except Exception as e:
-                logger.error(f"Failed to delete calibration from database: {e}")
\ No newline at end of file
+        Returns:
+            CalibrationResult
+        """
+        record = self.store.activate(camera_id, version)
+        if record is None:
+            return CalibrationResult(
+                success=False,
+                message=f"Camera {camera_id} has no calibration version {version}"
+            )
+        
+        self._apply(camera_id, record)
+        logger.info(f"Camera {camera_id} rolled back to calibration version {version}")
+        
+        return CalibrationResult(
+            success=True,
+            message=f"Camera {camera_id} restored to calibration version {version}",
+            transform_matrix=self.calibrations[camera_id]['transform_matrix'],
+            version=version
+        )
+    
+    def close(self):
+        """Commit queued calibration writes and artifacts, and close the database"""
+        self.store.close()
+        self.artifacts.close()
@@ -6,6 +6,8 @@ import cv2
 import numpy as np
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
 from datetime import datetime
 
@@ -14,6 +16,14 @@ from .click_calibrator import ClickCalibrator
 from .triangle_detector import TriangleDartDetector
 from .multi_camera_fusion import MultiCameraFusion, CameraDetection
 from .score_calculator import ScoreCalculator
+from .recording import FrameRecorder
+from .scheduler import FrameScheduler
+from .debug_stream import DebugStream
+from .background_model import BackgroundModel
+from .metrics import (
+    STAGE_SECONDS, FRAMES_PROCESSED, FRAMES_DROPPED, FRAMES_STALE,
+    DARTS_EMITTED, TAKEOUTS_EMITTED, FUSION_REJECTS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +31,31 @@ logger = logging.getLogger(__name__)
 class DartDetector:
     """
     Detects dart throws using OpenCV, triangle fitting, and multiple cameras.
+    
+    Processing modes:
+    - "threaded": each camera's CV pipeline runs in a bounded thread pool
+      so cameras are processed in parallel off the event loop (cv2 releases the GIL)
+    - "inline": cameras are processed one after another on the event loop
+    
+    Detection spaces:
+    - "board": frames are warped to the 800x800 board view before diffing
+    - "camera": diffing and triangle fitting run on the raw camera frame and
+      only the detected tip is transformed into board space for scoring
+    
+    Motion gate: before the full pipeline, a downscaled grayscale frame is
+    diffed against a downscaled reference. Frames where too few pixels
+    changed are skipped, unless a detection is currently being accumulated.
+    
+    Background: the references are running averages of quiet (gated) frames,
+    frozen while a detection is accumulating. When a dart is committed they
+    are rebased onto the frames that were just processed, and after a
+    takeout onto the frames seen once the board has settled, so the camera
+    is never re-read just to refresh a reference.
     """
     
+    PROCESSING_MODES = ("threaded", "inline")
+    DETECTION_SPACES = ("board", "camera")
+    
     def __init__(
         self,
         camera_indices: list[int],
@@ -30,8 +63,28 @@ class DartDetector:
         on_dart_detected: Optional[Callable] = None,
         on_takeout_detected: Optional[Callable] = None,
         calibrator: Optional[ClickCalibrator] = None,
-        triangle_detector: Optional[TriangleDartDetector] = None
+        triangle_detector: Optional[TriangleDartDetector] = None,
+        camera_manager: Optional[CameraManager] = None,
+        processing_mode: str = "threaded",
+        max_workers: Optional[int] = None,
+        detection_space: str = "board",
+        motion_gate: bool = True,
+        gate_pixel_threshold: int = 25,
+        gate_min_fraction: float = 0.002,
+        fusion_commit_margin: Optional[float] = None,
+        fusion_mode: str = "vote",
+        recorder: Optional[FrameRecorder] = None,
+        frame_interval: float = 0.033,
+        takeout_threshold: float = 1.0,
+        debug_stream: Optional[DebugStream] = None,
+        background_alpha: float = 0.05,
+        background_update_every: int = 5
     ):
+        if processing_mode not in self.PROCESSING_MODES:
+            raise ValueError(f"Unknown processing mode: {processing_mode}")
+        if detection_space not in self.DETECTION_SPACES:
+            raise ValueError(f"Unknown detection space: {detection_space}")
+        
         self.camera_indices = camera_indices
         self.resolution = resolution
         self.on_dart_detected = on_dart_detected
@@ -45,10 +98,9 @@ class DartDetector:
         self.dart_count = 0
         
         # Components
-        self.camera_manager = CameraManager()
+        self.camera_manager = camera_manager or CameraManager()
         self.calibrator = calibrator
         self.triangle_detector = triangle_detector or TriangleDartDetector()
-        self.camera_fusion = MultiCameraFusion(sample_frames=20)
         self.score_calculators: dict[int, ScoreCalculator] = {}
         
         # Setup score calculators from calibration
@@ -57,12 +109,171 @@ class DartDetector:
                 if self.calibrator.is_calibrated(cam_id):
                     center = self.calibrator.get_board_center(cam_id)
                     radii = self.calibrator.get_ring_radii(cam_id)
-                    self.score_calculators[cam_id] = ScoreCalculator(center, radii)
+                    self.score_calculators[cam_id] = ScoreCalculator(center, radii, artifacts=self.calibrator.artifacts)
                     self.is_calibrated = True
         
+        # Geometric fusion scores in the shared board space, so any
+        # camera's calculator will do (they all have the same geometry)
+        board_scorer = next(iter(self.score_calculators.values()), None)
+        if fusion_mode == "geometric" and board_scorer is None:
+            logger.warning("Geometric fusion needs a calibrated camera - falling back to voting")
+            fusion_mode = "vote"
+        
+        board_scale = board_scorer.center[0] / 400 if board_scorer else 1.0
+        self.camera_fusion = MultiCameraFusion(
+            sample_frames=20,
+            commit_margin=fusion_commit_margin,
+            mode=fusion_mode,
+            score_calculator=board_scorer,
+            outlier_radius=15.0 * board_scale,
+            commit_spread=5.0 * board_scale
+        )
+        
         # Detection parameters
-        self.frames_since_last_dart = 0
-        self.takeout_threshold = 30
+        self.last_dart_time: Optional[float] = None  # Frame time of the last detection
+        self.takeout_threshold = takeout_threshold    # Frame-time seconds without a detection before takeout
+        self.frame_interval = frame_interval          # Nominal frame period (~30 FPS, 0 for max-speed replay)
+        self.scheduler = FrameScheduler(frame_interval)
+        
+        # Optional session recording (frames read + events emitted)
+        self.recorder = recorder
+        
+        # Optional live debug view (only rendered while someone is watching)
+        self.debug_stream = debug_stream
+        
+        # Per-camera processing (one worker per camera unless overridden)
+        self.processing_mode = processing_mode
+        self.max_workers = max_workers or max(1, len(camera_indices))
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Optional[asyncio.Future] = None  # Batch running on the executor
+        self.processing_times: dict[int, float] = {}      # Last frame, ms
+        self.avg_processing_times: dict[int, float] = {}  # Moving average, ms
+        
+        self.detection_space = detection_space
+        
+        # Motion gate
+        self.motion_gate = motion_gate
+        self.gate_scale = 0.125                           # Downscale factor for gate images
+        self.gate_pixel_threshold = gate_pixel_threshold  # Per-pixel change to count as motion
+        self.gate_min_fraction = gate_min_fraction        # Changed-pixel fraction that opens the gate
+        self.gate_references: dict[int, np.ndarray] = {}
+        self.gate_frames: dict[int, int] = {}             # Frames seen by the gate
+        self.gate_skipped: dict[int, int] = {}            # Frames the gate skipped
+        self.gate_energy: dict[int, float] = {}           # Last changed-pixel fraction
+        self.gate_images: dict[int, np.ndarray] = {}      # Last gate image per camera
+        
+        # Adaptive background (the references above are snapshots of it)
+        self.background = BackgroundModel(background_alpha, background_alpha)
+        self.background_update_every = max(1, background_update_every)  # Quiet frames per diff-image update
+        self.takeout_settle = 0.5                        # Seconds after a takeout before rebasing
+        self._quiet_frames: dict[int, int] = {}
+        self._latest_prepared: dict[int, tuple[np.ndarray, Optional[np.ndarray]]] = {}  # Gate-open frames
+        self._rebase_at: Optional[float] = None          # Pending post-takeout rebase (frame time)
+        
+        # Fusion commit statistics
+        self.early_commits = 0
+        self.window_commits = 0
+        self.commit_frames: list[int] = []  # Buffered frames at each commit (recent)
+        
+        # Last capture sequence read per camera (gaps = frames overwritten unprocessed)
+        self.last_sequences: dict[int, int] = {}
+        self.stale_skips: dict[int, int] = {}  # Reads with no new frame since the last one
+    
+    def _gate_image(self, frame: np.ndarray) -> np.ndarray:
+        """Small grayscale version of a raw frame for the motion gate"""
+        small = cv2.resize(frame, None, fx=self.gate_scale, fy=self.gate_scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def _motion_gate_open(self, frame: np.ndarray, cam_idx: int) -> bool:
+        """
+        Decide whether a frame needs the full detection pipeline.
+        
+        Always open while fusion is accumulating a detection.
+        """
+        self.gate_frames[cam_idx] = self.gate_frames.get(cam_idx, 0) + 1
+        
+        reference = self.gate_references.get(cam_idx)
+        if not self.motion_gate or reference is None:
+            self.gate_images.pop(cam_idx, None)
+            return True
+        
+        start = time.perf_counter()
+        small = self._gate_image(frame)
+        self.gate_images[cam_idx] = small
+        diff = cv2.absdiff(small, reference)
+        _, changed = cv2.threshold(diff, self.gate_pixel_threshold, 255, cv2.THRESH_BINARY)
+        energy = cv2.countNonZero(changed) / changed.size
+        self.gate_energy[cam_idx] = energy
+        STAGE_SECONDS.observe_since(start, "motion_gate")
+        
+        if energy >= self.gate_min_fraction or self.camera_fusion.get_buffer_size() > 0:
+            return True
+        
+        self.gate_skipped[cam_idx] = self.gate_skipped.get(cam_idx, 0) + 1
+        FRAMES_DROPPED.inc(cam_idx, "motion_gate")
+        return False
+    
+    def _prepare_frame(self, frame: np.ndarray, cam_idx: int) -> np.ndarray:
+        """Convert a raw frame into the blurred grayscale image used for diffing"""
+        # Board space: warp the whole frame if calibrated
+        if self.detection_space == "board" and self.calibrator and self.calibrator.is_calibrated(cam_idx):
+            start = time.perf_counter()
+            frame = self.calibrator.transform_frame(frame, cam_idx)
+            STAGE_SECONDS.observe_since(start, "warp")
+        
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        STAGE_SECONDS.observe_since(start, "gray_blur")
+        return blurred
+    
+    def _update_background(self, frame: np.ndarray, cam_idx: int) -> Optional[np.ndarray]:
+        """
+        Blend a quiet frame into the background model and refresh the references.
+        
+        The gate image is blended every quiet frame; the full diff image only
+        every background_update_every quiet frames, since it needs a warp.
+        
+        Returns:
+            The prepared frame, if one was made
+        """
+        gate_reference = self.background.update_gate(cam_idx, self.gate_images[cam_idx])
+        if gate_reference is not None:
+            self.gate_references[cam_idx] = gate_reference
+        
+        quiet = self._quiet_frames[cam_idx] = self._quiet_frames.get(cam_idx, 0) + 1
+        if quiet % self.background_update_every or self.background.frozen:
+            return None
+        
+        start = time.perf_counter()
+        prepared = self._prepare_frame(frame, cam_idx)
+        reference = self.background.update(cam_idx, prepared)
+        if reference is not None:
+            self.reference_frames[cam_idx] = reference
+        STAGE_SECONDS.observe_since(start, "background")
+        return prepared
+    
+    def _rebase_background(self):
+        """Reset the background onto the latest processed frames (the board changed)"""
+        for cam_idx, (prepared, gate) in self._latest_prepared.items():
+            self.background.rebase(cam_idx, prepared, gate)
+            self.reference_frames[cam_idx] = prepared
+            if gate is not None:
+                self.gate_references[cam_idx] = gate
+        self._latest_prepared.clear()
+    
+    def _to_board_point(self, x: int, y: int, cam_idx: int) -> Optional[tuple[int, int]]:
+        """Map a detected tip into board coordinates for the current detection space"""
+        if self.detection_space == "board":
+            return x, y
+        
+        if not self.calibrator:
+            return None
+        
+        point = self.calibrator.transform_point((x, y), cam_idx)
+        if point is None:
+            return None
+        return int(point[0]), int(point[1])
     
     def capture_reference(self):
         """Capture reference frames (board with no darts)"""
@@ -72,17 +283,15 @@ class DartDetector:
             if cam_idx not in self.cameras:
                 continue
             
-            ret, frame = self.cameras[cam_idx].read()
-            if ret:
-                # Transform if calibrated
-                if self.calibrator and self.calibrator.is_calibrated(cam_idx):
-                    frame = self.calibrator.transform_frame(frame, cam_idx)
-                
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-                self.reference_frames[cam_idx] = blurred
+            frame = self._read_frame(cam_idx)
+            if frame is not None:
+                self.reference_frames[cam_idx] = self._prepare_frame(frame, cam_idx)
+                self.gate_references[cam_idx] = self._gate_image(frame)
+                self.background.rebase(cam_idx, self.reference_frames[cam_idx], self.gate_references[cam_idx])
                 logger.info(f"Reference captured for camera {cam_idx}")
         
+        self._latest_prepared.clear()
+        self._rebase_at = None
         self.dart_count = 0
     
     async def start(self):
@@ -90,10 +299,17 @@ class DartDetector:
         logger.info("Starting dart detection...")
         self.is_running = True
         
+        if self.processing_mode == "threaded":
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="dart-cv"
+            )
+        
         try:
-            # Open all cameras
+            # Open all cameras (device opens block, keep them off the event loop)
             for cam_idx in self.camera_indices:
-                self.cameras[cam_idx] = self.camera_manager.open_camera(
+                self.cameras[cam_idx] = await asyncio.to_thread(
+                    self.camera_manager.open_camera,
                     cam_idx,
                     self.resolution[0],
                     self.resolution[1]
@@ -102,6 +318,7 @@ class DartDetector:
             logger.info(f"Opened {len(self.cameras)} cameras")
             
             await asyncio.sleep(1)
+            await asyncio.to_thread(self.camera_manager.wait_for_frames, 2.0)
             self.capture_reference()
             
             await self._detection_loop()
@@ -116,91 +333,271 @@ class DartDetector:
         logger.info("Stopping dart detection...")
         self.is_running = False
         
+        # Workers write per-camera state - let the batch in flight finish
+        # first (the loop starts no new batch once is_running is False)
+        if self._in_flight is not None:
+            await asyncio.wait([self._in_flight])
+            self._in_flight = None
+        
+        if self.executor:
+            await asyncio.to_thread(self.executor.shutdown, True)
+            self.executor = None
+        
         for cam_idx in list(self.cameras.keys()):
-            self.camera_manager.release_camera(cam_idx)
+            await asyncio.to_thread(self.camera_manager.release_camera, cam_idx)
         
         self.cameras.clear()
         self.reference_frames.clear()
+        if self.debug_stream:
+            self.debug_stream.clear()  # Viewers of a later session must not get these frames
+        self.gate_references.clear()
+        self.background.clear()
+        self._latest_prepared.clear()
+        
+        if self.recorder:
+            await asyncio.to_thread(self.recorder.close)
+            self.recorder = None
+    
+    def get_processing_stats(self) -> dict:
+        """Get per-camera processing times in milliseconds"""
+        return {
+            "mode": self.processing_mode,
+            "max_workers": self.max_workers if self.processing_mode == "threaded" else 1,
+            "cameras": {
+                cam_idx: {
+                    "last_ms": round(last_ms, 2),
+                    "avg_ms": round(self.avg_processing_times.get(cam_idx, last_ms), 2)
+                }
+                for cam_idx, last_ms in list(self.processing_times.items())  # Workers may add cameras
+            },
+            "motion_gate": {
+                "enabled": self.motion_gate,
+                "pixel_threshold": self.gate_pixel_threshold,
+                "min_fraction": self.gate_min_fraction,
+                "cameras": {
+                    cam_idx: {
+                        "frames": frames,
+                        "skipped": self.gate_skipped.get(cam_idx, 0),
+                        "skip_fraction": round(self.gate_skipped.get(cam_idx, 0) / frames, 3),
+                        "last_energy": round(self.gate_energy.get(cam_idx, 0.0), 4)
+                    }
+                    for cam_idx, frames in list(self.gate_frames.items())
+                }
+            },
+            "background": {
+                **self.background.get_stats(),
+                "update_every": self.background_update_every,
+                "rebase_pending": self._rebase_at is not None
+            },
+            "scheduler": {
+                **self.scheduler.get_stats(),
+                "stale_skips": dict(self.stale_skips)
+            },
+            "fusion": {
+                "mode": self.camera_fusion.mode,
+                "commit_margin": self.camera_fusion.commit_margin,
+                "commit_spread": self.camera_fusion.commit_spread if self.camera_fusion.mode == "geometric" else None,
+                "early_commits": self.early_commits,
+                "window_commits": self.window_commits,
+                "median_commit_frames": sorted(self.commit_frames)[len(self.commit_frames) // 2] if self.commit_frames else None
+            }
+        }
+    
+    def _read_frame(self, cam_idx: int, skip_stale: bool = False) -> Optional[np.ndarray]:
+        """
+        Get the latest frame from the camera's capture thread (non-blocking).
+        
+        Args:
+            cam_idx: Camera index
+            skip_stale: Return None if no new frame arrived since the last read
+        """
+        captured = self.camera_manager.get_latest_frame(cam_idx)
+        if captured is None:
+            FRAMES_DROPPED.inc(cam_idx, "unavailable")
+            return None
+        
+        last = self.last_sequences.get(cam_idx)
+        if skip_stale and last is not None and captured.sequence == last:
+            self.stale_skips[cam_idx] = self.stale_skips.get(cam_idx, 0) + 1
+            FRAMES_STALE.inc(cam_idx)
+            return None
+        
+        self.scheduler.observe_frame(cam_idx, captured.timestamp, captured.sequence)
+        if last is not None and captured.sequence > last + 1:
+            FRAMES_DROPPED.inc(cam_idx, "overwritten", amount=captured.sequence - last - 1)
+        self.last_sequences[cam_idx] = captured.sequence
+        
+        if self.recorder:
+            self.recorder.record_frame(cam_idx, captured)
+        
+        return captured.frame
     
     async def _detection_loop(self):
         """Main detection loop"""
         logger.info("Detection loop started")
         
         while self.is_running:
+            if self.camera_manager.is_exhausted():
+                logger.info("Frame source exhausted - stopping detection loop")
+                self.is_running = False
+                break
+            
             try:
+                self.scheduler.begin_iteration()
                 detected = await self._check_for_darts()
                 
+                # Frame time, not wall-clock, so max-speed replays behave like live
+                now = self.scheduler.frame_time()
                 if detected:
-                    self.frames_since_last_dart = 0
-                else:
-                    self.frames_since_last_dart += 1
-                
-                if self.dart_count > 0 and self.frames_since_last_dart > self.takeout_threshold:
+                    self.last_dart_time = now
+                elif self.last_dart_time is not None and now - self.last_dart_time > self.takeout_threshold:
+                    # Once per quiet period, not on every iteration after it
+                    self.last_dart_time = None
                     await self._handle_takeout()
                 
-                await asyncio.sleep(0.033)  # ~30 FPS
+                await self.scheduler.wait()
                 
             except Exception as e:
                 logger.error(f"Error in detection loop: {e}")
                 await asyncio.sleep(1)
     
-    async def _check_for_darts(self) -> bool:
-        """Check all cameras for dart detection"""
-        detections = []
+    def _process_camera(self, cam_idx: int) -> Optional[CameraDetection]:
+        """
+        Run the CV pipeline for one camera on its latest frame.
         
-        for cam_idx in self.camera_indices:
-            if cam_idx not in self.cameras or cam_idx not in self.reference_frames:
-                continue
-            
-            ret, frame = self.cameras[cam_idx].read()
-            if not ret:
-                continue
+        In threaded mode each camera of a batch runs on its own worker, and
+        the loop awaits the whole batch before it touches detector state
+        again. A worker therefore only writes its own camera's entries:
+        last_sequences, stale_skips, the gate_* dicts, reference_frames,
+        _latest_prepared, processing_times and the scheduler's frame clock.
+        The recorder, background model, debug stream and metrics are shared
+        and lock internally. Everything else is only read, and only changes
+        between batches. stop() waits for the batch in flight before
+        clearing any of it.
+        """
+        start = time.perf_counter()
+        
+        try:
+            frame = self._read_frame(cam_idx, skip_stale=True)
+            if frame is None:
+                return None
             
-            # Transform if calibrated
-            if self.calibrator and self.calibrator.is_calibrated(cam_idx):
-                frame = self.calibrator.transform_frame(frame, cam_idx)
+            if not self._motion_gate_open(frame, cam_idx):
+                self._latest_prepared.pop(cam_idx, None)
+                prepared = self._update_background(frame, cam_idx)
+                if self.debug_stream and self.debug_stream.wants_frame(cam_idx):
+                    if prepared is None:
+                        prepared = self._prepare_frame(frame, cam_idx)
+                    self.debug_stream.publish(cam_idx, prepared, None, [], [], self.triangle_detector)
+                return None
             
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            FRAMES_PROCESSED.inc(cam_idx)
+            blurred = self._prepare_frame(frame, cam_idx)
+            self._latest_prepared[cam_idx] = (blurred, self.gate_images.get(cam_idx))
             
             # Calculate difference
+            diff_start = time.perf_counter()
             diff = cv2.absdiff(self.reference_frames[cam_idx], blurred)
+            STAGE_SECONDS.observe_since(diff_start, "absdiff")
             
             # Detect dart tips using triangle fitting
-            dart_detections = self.triangle_detector.detect_dart(diff, top_n=1)
+            contours = self.triangle_detector.find_candidates(diff, top_n=1)
+            dart_detections = self.triangle_detector.detect_dart(diff, top_n=1, contours=contours)
             
-            if dart_detections:
-                best_dart = dart_detections[0]
-                
-                # Calculate score if calibrated
-                if cam_idx in self.score_calculators:
-                    score_result = self.score_calculators[cam_idx].calculate_score(
-                        best_dart.tip_x,
-                        best_dart.tip_y
-                    )
-                    
-                    detections.append(CameraDetection(
-                        camera_id=cam_idx,
-                        segment=score_result.segment,
-                        value=score_result.value,
-                        multiplier=score_result.multiplier,
-                        confidence=best_dart.confidence,
-                        x=best_dart.tip_x,
-                        y=best_dart.tip_y
-                    ))
+            if self.debug_stream and self.debug_stream.wants_frame(cam_idx):
+                self.debug_stream.publish(cam_idx, blurred, diff, contours, dart_detections, self.triangle_detector)
+            
+            if not dart_detections or cam_idx not in self.score_calculators:
+                return None
+            
+            best_dart = dart_detections[0]
+            
+            tip = self._to_board_point(best_dart.tip_x, best_dart.tip_y, cam_idx)
+            if tip is None:
+                return None
+            
+            # Calculate score (single lookup table index)
+            score_start = time.perf_counter()
+            segment, value, multiplier = self.score_calculators[cam_idx].lookup_score(tip[0], tip[1])
+            STAGE_SECONDS.observe_since(score_start, "score")
+            
+            return CameraDetection(
+                camera_id=cam_idx,
+                segment=segment,
+                value=value,
+                multiplier=multiplier,
+                confidence=best_dart.confidence,
+                x=tip[0],
+                y=tip[1]
+            )
+        finally:
+            self._record_processing_time(cam_idx, (time.perf_counter() - start) * 1000)
+    
+    def _record_processing_time(self, cam_idx: int, elapsed_ms: float):
+        """Track last and moving-average processing time for a camera"""
+        self.processing_times[cam_idx] = elapsed_ms
+        previous = self.avg_processing_times.get(cam_idx, elapsed_ms)
+        self.avg_processing_times[cam_idx] = previous * 0.9 + elapsed_ms * 0.1
+    
+    async def _check_for_darts(self) -> bool:
+        """Check all cameras for dart detection"""
+        active = [
+            cam_idx for cam_idx in self.camera_indices
+            if cam_idx in self.cameras and cam_idx in self.reference_frames
+        ]
+        
+        # Same condition that holds the gate open: don't learn while accumulating
+        self.background.frozen = self.camera_fusion.get_buffer_size() > 0
+        
+        if self.executor:
+            # Process cameras in parallel, loop only awaits the combined result
+            loop = asyncio.get_running_loop()
+            self._in_flight = asyncio.gather(*(
+                loop.run_in_executor(self.executor, self._process_camera, cam_idx)
+                for cam_idx in active
+            ))
+            results = await self._in_flight
+        else:
+            results = [self._process_camera(cam_idx) for cam_idx in active]
+        
+        if self._rebase_at is not None:
+            # Settling after a takeout: frames only refresh the latest views
+            now = self.scheduler.frame_time()
+            if now is not None and now >= self._rebase_at:
+                self._rebase_background()
+                self._rebase_at = None
+            return False
+        
+        detections = [d for d in results if d is not None]
         
         # Fuse detections from all cameras
         if detections:
+            fusion_start = time.perf_counter()
             self.camera_fusion.add_detections(detections)
             
-            # Check if we have enough samples
-            if self.camera_fusion.get_buffer_size() >= 10:
+            buffered = self.camera_fusion.get_buffer_size()
+            
+            # Commit early on decisive evidence, otherwise wait for enough samples
+            fused = self.camera_fusion.get_early_detection()
+            if fused:
+                self.early_commits += 1
+            elif buffered >= 10:
                 fused = self.camera_fusion.get_fused_detection()
-                
                 if fused and fused.agreement >= 0.5:
-                    await self._process_fused_detection(fused)
-                    self.camera_fusion.reset_buffer()
-                    return True
+                    self.window_commits += 1
+                else:
+                    fused = None
+                    if buffered >= self.camera_fusion.sample_frames:
+                        # A full window that never agreed: discard it and start over
+                        FUSION_REJECTS.inc()
+                        self.camera_fusion.reset_buffer()
+            STAGE_SECONDS.observe_since(fusion_start, "fusion")
+            
+            if fused:
+                self.commit_frames = self.commit_frames[-99:] + [buffered]
+                await self._process_fused_detection(fused)
+                self.camera_fusion.reset_buffer()
+                return True
         
         return False
     
@@ -209,6 +606,7 @@ class DartDetector:
         self.dart_count += 1
         if self.dart_count > 3:
             self.dart_count = 1
+        DARTS_EMITTED.inc()
         
         event = {
             'segment': fused.segment,
@@ -221,19 +619,28 @@ class DartDetector:
         
         logger.info(f"Dart {self.dart_count} detected: {event['segment']} (conf: {fused.confidence:.2f}, agreement: {fused.agreement:.2f})")
         
+        if self.recorder:
+            self.recorder.record_event({'type': 'dart_detected', **event})
+        
         if self.on_dart_detected:
             await self.on_dart_detected(event)
         
-        # Update reference
-        self.capture_reference()
+        # The dart is part of the board now - rebase onto the frames that showed it
+        self._rebase_background()
     
     async def _handle_takeout(self):
         """Handle takeout detection"""
         logger.info("Takeout detected")
+        TAKEOUTS_EMITTED.inc()
+        
+        if self.recorder:
+            self.recorder.record_event({'type': 'takeout_detected'})
         
         if self.on_takeout_detected:
             await self.on_takeout_detected()
         
         self.dart_count = 0
-        await asyncio.sleep(0.5)
-        self.capture_reference()
+        
+        # Rebase once hands are clear of the board, without pausing the loop
+        self._latest_prepared.clear()
+        self._rebase_at = (self.scheduler.frame_time() or 0.0) + self.takeout_settle
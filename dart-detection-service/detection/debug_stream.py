@@ -0,0 +1,154 @@
+"""
+Debug Stream
+Live per-camera view of what the detector sees (board view with the fitted
+triangle and tip, difference image with contours), served as MJPEG.
+
+Each rendered view is JPEG-encoded once into a per-camera slot that every
+viewer reads. Viewers always take the newest slot, so a slow viewer skips
+frames instead of holding up the pipeline, and nothing is rendered for a
+camera nobody is watching.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+import cv2
+import numpy as np
+
+from .metrics import STAGE_SECONDS
+from .triangle_detector import TriangleDartDetector, DartDetection
+
+MJPEG_BOUNDARY = "frame"
+
+
+class DebugStream:
+    """Per-camera latest-frame slots for debug viewers"""
+    
+    def __init__(self, max_fps: float = 10.0, quality: int = 70, panel_height: int = 400):
+        """
+        Args:
+            max_fps: Render rate cap per camera (rendering happens on the detection path)
+            quality: JPEG quality
+            panel_height: Height of each panel in the composed view (pixels)
+        """
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.quality = quality
+        self.panel_height = panel_height
+        
+        self.viewers: dict[int, int] = {}
+        self.frames_rendered: dict[int, int] = {}
+        
+        self._latest: dict[int, tuple[int, bytes]] = {}  # camera -> (sequence, jpeg)
+        self._last_render: dict[int, float] = {}
+        self._events: dict[int, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def wants_frame(self, cam_idx: int) -> bool:
+        """Cheap hot-path check: is anyone watching, and is a render due?"""
+        if not self.viewers.get(cam_idx):
+            return False
+        return time.monotonic() - self._last_render.get(cam_idx, 0.0) >= self.min_interval
+    
+    def publish(
+        self,
+        cam_idx: int,
+        board_image: np.ndarray,
+        diff: Optional[np.ndarray],
+        contours: list[np.ndarray],
+        detections: list[DartDetection],
+        triangle_detector: TriangleDartDetector
+    ):
+        """
+        Render and encode one debug view (safe to call from a worker thread).
+        
+        Args:
+            cam_idx: Camera index
+            board_image: Grayscale image the diff was taken against (board or camera space)
+            diff: Difference image, or None if the motion gate skipped the frame
+            contours: Candidate contours the detector found in diff
+            detections: Dart detections found in diff
+            triangle_detector: Detector used for overlays
+        """
+        start = time.perf_counter()
+        self._last_render[cam_idx] = time.monotonic()
+        
+        view = cv2.cvtColor(board_image, cv2.COLOR_GRAY2BGR)
+        for detection in detections:
+            view = triangle_detector.visualize_detection(view, detection)
+        
+        if diff is not None:
+            diff_view = cv2.cvtColor(diff, cv2.COLOR_GRAY2BGR)
+            cv2.drawContours(diff_view, contours, -1, (0, 255, 255), 1)
+        else:
+            diff_view = np.zeros_like(view)
+            cv2.putText(diff_view, "motion gate closed", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (128, 128, 128), 2)
+        
+        scale = self.panel_height / view.shape[0]
+        panels = [
+            cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            for image in (view, diff_view)
+        ]
+        composed = np.hstack(panels)
+        cv2.putText(composed, f"Camera {cam_idx}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+        
+        ok, encoded = cv2.imencode('.jpg', composed, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        
+        sequence = self._latest.get(cam_idx, (0, b""))[0] + 1
+        self._latest[cam_idx] = (sequence, encoded.tobytes())
+        self.frames_rendered[cam_idx] = self.frames_rendered.get(cam_idx, 0) + 1
+        STAGE_SECONDS.observe_since(start, "debug_render")
+        
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake, cam_idx)
+    
+    def _wake(self, cam_idx: int):
+        """Wake viewers waiting on a camera (event loop thread)"""
+        event = self._events.pop(cam_idx, None)
+        if event is not None:
+            event.set()
+    
+    async def frames(self, cam_idx: int) -> AsyncIterator[bytes]:
+        """Yield each newly rendered JPEG for a camera, skipping any the viewer was too slow for"""
+        self._loop = asyncio.get_running_loop()
+        self.viewers[cam_idx] = self.viewers.get(cam_idx, 0) + 1
+        last_sequence = 0
+        
+        try:
+            while True:
+                latest = self._latest.get(cam_idx)
+                if latest is not None and latest[0] != last_sequence:
+                    last_sequence = latest[0]
+                    yield latest[1]
+                    continue
+                
+                event = self._events.setdefault(cam_idx, asyncio.Event())
+                await event.wait()
+        finally:
+            self.viewers[cam_idx] -= 1
+            if not self.viewers[cam_idx]:
+                # Nobody watching: the next viewer must not start on an old frame
+                self._latest.pop(cam_idx, None)
+                self._last_render.pop(cam_idx, None)
+    
+    def clear(self):
+        """Drop every camera's last rendered frame (detection stopped)"""
+        self._latest.clear()
+        self._last_render.clear()
+    
+    async def mjpeg(self, cam_idx: int) -> AsyncIterator[bytes]:
+        """multipart/x-mixed-replace body for a camera's debug view"""
+        async for jpeg in self.frames(cam_idx):
+            yield (
+                f"--{MJPEG_BOUNDARY}\r\n"
+                f"Content-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n"
+            ).encode() + jpeg + b"\r\n"
+    
+    def get_stats(self) -> dict:
+        """Viewer and render counts per camera"""
+        return {
+            "viewers": {cam: count for cam, count in self.viewers.items() if count},
+            "frames_rendered": dict(self.frames_rendered)
+        }
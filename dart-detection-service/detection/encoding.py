@@ -0,0 +1,119 @@
+"""
+Event Encoding
+Wire formats for /events messages: JSON text, or MessagePack binary for
+clients that negotiate it.
+
+The MessagePack encoder covers the types events use (None, bool, int,
+float, str, bytes, list/tuple, dict) and follows the spec, so any
+standard msgpack decoder reads it. It is built in to keep the service
+free of extra dependencies.
+"""
+import json
+import numbers
+import struct
+from typing import Union
+
+FORMATS = ("json", "msgpack")
+MSGPACK_SUBPROTOCOL = "mydarts.msgpack"
+
+
+def _pack_length(out: bytearray, length: int, fix_base: int, fix_max: int, codes: tuple[int, int, int]):
+    """Header for a str/array/map of the given length"""
+    if length <= fix_max:
+        out.append(fix_base | length)
+    elif codes[0] and length < 0x100:
+        out += struct.pack(">BB", codes[0], length)
+    elif length < 0x10000:
+        out += struct.pack(">BH", codes[1], length)
+    else:
+        out += struct.pack(">BI", codes[2], length)
+
+
+def _pack_into(out: bytearray, obj):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, numbers.Integral):
+        obj = int(obj)
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif obj >= 0:
+            for limit, fmt, code in ((0x100, ">BB", 0xcc), (0x10000, ">BH", 0xcd), (0x100000000, ">BI", 0xce)):
+                if obj < limit:
+                    out += struct.pack(fmt, code, obj)
+                    break
+            else:
+                out += struct.pack(">BQ", 0xcf, obj)
+        else:
+            for limit, fmt, code in ((0x80, ">Bb", 0xd0), (0x8000, ">Bh", 0xd1), (0x80000000, ">Bi", 0xd2)):
+                if obj >= -limit:
+                    out += struct.pack(fmt, code, obj)
+                    break
+            else:
+                out += struct.pack(">Bq", 0xd3, obj)
+    elif isinstance(obj, numbers.Real):
+        out += struct.pack(">Bd", 0xcb, float(obj))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _pack_length(out, len(data), 0xa0, 31, (0xd9, 0xda, 0xdb))
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        length = len(obj)
+        if length < 0x100:
+            out += struct.pack(">BB", 0xc4, length)
+        elif length < 0x10000:
+            out += struct.pack(">BH", 0xc5, length)
+        else:
+            out += struct.pack(">BI", 0xc6, length)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(out, len(obj), 0x90, 15, (0, 0xdc, 0xdd))
+        for item in obj:
+            _pack_into(out, item)
+    elif isinstance(obj, dict):
+        _pack_length(out, len(obj), 0x80, 15, (0, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack_into(out, key)
+            _pack_into(out, value)
+    else:
+        # Same fallback as json.dumps(default=str)
+        _pack_into(out, str(obj))
+
+
+def packb(obj) -> bytes:
+    """Encode an object as MessagePack"""
+    out = bytearray()
+    _pack_into(out, obj)
+    return bytes(out)
+
+
+def pack_array_header(length: int) -> bytes:
+    """MessagePack array header (for splicing pre-encoded items into a batch)"""
+    out = bytearray()
+    _pack_length(out, length, 0x90, 15, (0, 0xdc, 0xdd))
+    return bytes(out)
+
+
+def encode(message: dict, fmt: str) -> Union[str, bytes]:
+    """Encode one message in a wire format"""
+    if fmt == "msgpack":
+        return packb(message)
+    return json.dumps(message, default=str)
+
+
+def pack_batch(encoded: list[bytes]) -> bytes:
+    """
+    One MessagePack frame for several already-packed messages.
+    
+    A single message is sent as-is; several become an array of them.
+    Only msgpack clients get batched frames - JSON is always one message
+    per frame.
+    """
+    if len(encoded) == 1:
+        return encoded[0]
+    return pack_array_header(len(encoded)) + b"".join(encoded)
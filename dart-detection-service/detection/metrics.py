@@ -0,0 +1,216 @@
+"""
+Detection Metrics
+Low-overhead counters and histograms for the detection pipeline, exported
+in the Prometheus text exposition format.
+
+Hot-path cost is a perf_counter() call, a bisect over a short bucket list
+and a few integer updates under a per-metric lock (about a microsecond),
+so stages can be timed on every frame.
+"""
+import bisect
+import threading
+import time
+from typing import Optional
+
+# Stage latency buckets in seconds (50us .. 1s)
+STAGE_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    """Render a label set: {name="value",...}"""
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Prometheus float formatting (integers without a trailing .0)"""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount: float = 1):
+        """Add amount to the series for these label values"""
+        key = tuple(str(v) for v in label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, *label_values) -> float:
+        """Current value of one series (0 if never incremented)"""
+        return self._values.get(tuple(str(v) for v in label_values), 0)
+    
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labels:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values]
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally split by labels"""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = STAGE_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (last = +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *label_values):
+        """Record one observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        key = tuple(str(v) for v in label_values)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def observe_since(self, start: float, *label_values) -> float:
+        """Record time.perf_counter() - start and return it"""
+        elapsed = time.perf_counter() - start
+        self.observe(elapsed, *label_values)
+        return elapsed
+    
+    def snapshot(self, *label_values) -> Optional[tuple[list[int], float]]:
+        """(per-bucket counts, sum) for one series"""
+        with self._lock:
+            series = self._series.get(tuple(str(v) for v in label_values))
+            return (list(series[0]), series[1]) if series else None
+    
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+    
+    def __init__(self):
+        self.metrics: dict[str, object] = {}
+    
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = STAGE_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+    
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        """All metrics in Prometheus text format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "mydarts_stage_seconds",
+    "Time spent in each detection pipeline stage",
+    ("stage",)
+)
+FRAMES_CAPTURED = REGISTRY.counter(
+    "mydarts_frames_captured_total",
+    "Frames read from each camera by its capture thread",
+    ("camera",)
+)
+FRAMES_PROCESSED = REGISTRY.counter(
+    "mydarts_frames_processed_total",
+    "Frames run through the full detection pipeline",
+    ("camera",)
+)
+FRAMES_DROPPED = REGISTRY.counter(
+    "mydarts_frames_dropped_total",
+    "Frames not processed, by reason (overwritten, motion_gate, unavailable)",
+    ("camera", "reason")
+)
+DARTS_EMITTED = REGISTRY.counter(
+    "mydarts_darts_emitted_total",
+    "Dart events emitted by fusion"
+)
+TAKEOUTS_EMITTED = REGISTRY.counter(
+    "mydarts_takeouts_emitted_total",
+    "Takeout events emitted"
+)
+FUSION_REJECTS = REGISTRY.counter(
+    "mydarts_fusion_rejects_total",
+    "Full fusion windows discarded without reaching agreement"
+)
+FRAMES_STALE = REGISTRY.counter(
+    "mydarts_frames_stale_total",
+    "Reads that found no new frame since the last one processed (skipped)",
+    ("camera",)
+)
+LOOP_OVERRUNS = REGISTRY.counter(
+    "mydarts_loop_overruns_total",
+    "Detection iterations that took longer than a camera frame period"
+)
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "mydarts_loop_lag_seconds",
+    "How late the detection loop woke up after its scheduled deadline"
+)
+EVENT_SEND_LAG_SECONDS = REGISTRY.histogram(
+    "mydarts_event_send_lag_seconds",
+    "Time from publishing an event to it being written to a client socket"
+)
+EVENTS_DROPPED = REGISTRY.counter(
+    "mydarts_events_dropped_total",
+    "Events not delivered to a client because its queue was full, by policy",
+    ("policy",)
+)
@@ -1,12 +1,16 @@
 """
 Multi-Camera Fusion
 Combines detections from multiple cameras for higher accuracy.
-Uses mode-based voting when multiple cameras detect the same dart.
+Uses mode-based voting when multiple cameras detect the same dart,
+or a robust estimate of the tip position in shared board space.
 """
 import logging
+import numpy as np
 from typing import List, Optional
 from dataclasses import dataclass
-from collections import Counter
+from collections import Counter, deque
+
+from .score_calculator import ScoreCalculator
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,8 @@ class FusedDetection:
     confidence: float
     num_cameras: int
     agreement: float  # 0.0 to 1.0, how many cameras agree
+    x: Optional[int] = None  # Fused board position (geometric mode)
+    y: Optional[int] = None
 
 
 class MultiCameraFusion:
@@ -42,13 +48,42 @@ class MultiCameraFusion:
     1. Mode voting: Most common result wins
     2. Confidence weighting: Higher confidence cameras weighted more
     3. Agreement scoring: How well cameras agree
+    
+    Votes are kept as running totals over a sliding window, updated as
+    frames enter and leave, so the fused answer costs the same no matter
+    how large sample_frames is.
+    
+    Early commit (opt-in): a sequential test on the same totals. As soon as
+    the leading segment's confidence-weighted votes beat the runner-up by
+    commit_margin, the result can be committed without waiting for the
+    full window. Ambiguous evidence never passes the bound, so those
+    darts still go through the normal windowed vote. Off by default until
+    its effect on misreads has been measured on recorded sessions.
+    
+    Modes:
+    - "vote": segment strings are voted on (default)
+    - "geometric": buffered tip positions from all cameras are combined with
+      a confidence-weighted median, outliers beyond outlier_radius are
+      rejected, and the inlier position is scored once. A dart on a wire
+      read as "T20" by one camera and "1" by another still agrees here.
+      Early commit is on by default in this mode: once at least
+      GEOMETRIC_COMMIT_SAMPLES inliers from two or more cameras agree to
+      within commit_spread on each axis, the position is committed.
     """
     
+    MODES = ("vote", "geometric")
+    GEOMETRIC_COMMIT_SAMPLES = 3
+    
     def __init__(
         self,
         min_agreement: float = 0.5,
         confidence_threshold: float = 0.3,
-        sample_frames: int = 20
+        sample_frames: int = 20,
+        commit_margin: Optional[float] = None,
+        mode: str = "vote",
+        score_calculator: Optional[ScoreCalculator] = None,
+        outlier_radius: float = 15.0,
+        commit_spread: Optional[float] = 5.0
     ):
         """
         Initialize fusion system.
@@ -57,13 +92,38 @@ class MultiCameraFusion:
             min_agreement: Minimum agreement fraction to accept result
             confidence_threshold: Minimum confidence to consider detection
             sample_frames: Number of frames to sample for mode calculation
+            commit_margin: Confidence-weighted vote lead over the runner-up
+                           needed to commit early (None disables early commit)
+            mode: "vote" or "geometric"
+            score_calculator: Scores the fused position (required for geometric mode)
+            outlier_radius: Geometric mode - max distance (board pixels) from
+                            the weighted median for a sample to count as inlier
+            commit_spread: Geometric mode - max per-axis standard deviation
+                           (board pixels) of the inliers to commit early
+                           (None disables; commit_margin applies as well if set)
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown fusion mode: {mode}")
+        if mode == "geometric" and score_calculator is None:
+            raise ValueError("Geometric fusion requires a score calculator")
+        
         self.min_agreement = min_agreement
         self.confidence_threshold = confidence_threshold
         self.sample_frames = sample_frames
+        self.commit_margin = commit_margin
+        self.mode = mode
+        self.score_calculator = score_calculator
+        self.outlier_radius = outlier_radius
+        self.commit_spread = commit_spread
         
         # Buffer for sampling multiple frames
-        self.detection_buffer: List[List[CameraDetection]] = []
+        self.detection_buffer: deque[List[CameraDetection]] = deque()
+        
+        # Running totals over the buffer
+        self.segment_counts: dict[str, int] = {}
+        self.confidence_sums: dict[str, float] = {}
+        self.segment_cameras: dict[str, Counter] = {}  # segment -> camera_id -> count
+        self.total_detections = 0
     
     def add_detections(self, detections: List[CameraDetection]):
         """
@@ -80,10 +140,40 @@ class MultiCameraFusion:
         
         if filtered:
             self.detection_buffer.append(filtered)
+            self._add_votes(filtered)
         
         # Keep buffer size limited
-        if len(self.detection_buffer) > self.sample_frames:
-            self.detection_buffer.pop(0)
+        while len(self.detection_buffer) > self.sample_frames:
+            self._remove_votes(self.detection_buffer.popleft())
+    
+    def _add_votes(self, frame_detections: List[CameraDetection]):
+        """Add one frame's detections to the running totals"""
+        for det in frame_detections:
+            self.segment_counts[det.segment] = self.segment_counts.get(det.segment, 0) + 1
+            self.confidence_sums[det.segment] = self.confidence_sums.get(det.segment, 0.0) + det.confidence
+            self.segment_cameras.setdefault(det.segment, Counter())[det.camera_id] += 1
+            self.total_detections += 1
+    
+    def _remove_votes(self, frame_detections: List[CameraDetection]):
+        """Remove one frame's detections from the running totals"""
+        for det in frame_detections:
+            self.total_detections -= 1
+            count = self.segment_counts[det.segment] - 1
+            
+            if count == 0:
+                # Drop the segment entirely (also resets float drift in the sum)
+                del self.segment_counts[det.segment]
+                del self.confidence_sums[det.segment]
+                del self.segment_cameras[det.segment]
+                continue
+            
+            self.segment_counts[det.segment] = count
+            self.confidence_sums[det.segment] -= det.confidence
+            
+            cameras = self.segment_cameras[det.segment]
+            cameras[det.camera_id] -= 1
+            if cameras[det.camera_id] == 0:
+                del cameras[det.camera_id]
     
     def get_fused_detection(self) -> Optional[FusedDetection]:
         """
@@ -95,49 +185,157 @@ class MultiCameraFusion:
         if len(self.detection_buffer) < self.sample_frames // 2:
             return None  # Not enough samples yet
         
-        # Collect all segment results
-        all_segments = []
-        segment_confidences = {}
-        
-        for frame_detections in self.detection_buffer:
-            for det in frame_detections:
-                all_segments.append(det.segment)
-                
-                if det.segment not in segment_confidences:
-                    segment_confidences[det.segment] = []
-                segment_confidences[det.segment].append(det.confidence)
-        
-        if not all_segments:
+        if not self.total_detections:
             return None
         
-        # Find mode (most common result)
-        segment_counts = Counter(all_segments)
-        most_common_segment, count = segment_counts.most_common(1)[0]
+        if self.mode == "geometric":
+            return self._get_geometric_detection()
+        
+        # Find mode (most common result) from the running counts
+        most_common_segment = max(self.segment_counts, key=self.segment_counts.get)
+        count = self.segment_counts[most_common_segment]
         
         # Calculate agreement
-        total_detections = len(all_segments)
-        agreement = count / total_detections
+        agreement = count / self.total_detections
         
         # Check if agreement meets threshold
         if agreement < self.min_agreement:
             logger.debug(f"Low agreement: {agreement:.2f} < {self.min_agreement}")
             return None
         
+        return self._build_fused(most_common_segment, agreement)
+    
+    def get_early_detection(self) -> Optional[FusedDetection]:
+        """
+        Commit before the window fills when the evidence is decisive.
+        
+        The leader's summed confidence must exceed the runner-up's by
+        commit_margin, and its vote share must still meet min_agreement.
+        Geometric mode uses commit_spread and/or commit_margin instead.
+        
+        Returns:
+            FusedDetection, or None to keep accumulating
+        """
+        if not self.total_detections:
+            return None
+        
+        if self.mode == "geometric":
+            if self.commit_margin is None and self.commit_spread is None:
+                return None
+            return self._get_geometric_detection(
+                commit_margin=self.commit_margin,
+                commit_spread=self.commit_spread
+            )
+        
+        if self.commit_margin is None:
+            return None
+        
+        leader = None
+        leader_weight = 0.0
+        runner_up_weight = 0.0
+        for segment, weight in self.confidence_sums.items():
+            if weight > leader_weight:
+                leader, leader_weight, runner_up_weight = segment, weight, leader_weight
+            elif weight > runner_up_weight:
+                runner_up_weight = weight
+        
+        if leader is None or leader_weight - runner_up_weight < self.commit_margin:
+            return None
+        
+        agreement = self.segment_counts[leader] / self.total_detections
+        if agreement < self.min_agreement:
+            return None
+        
+        return self._build_fused(leader, agreement)
+    
+    @staticmethod
+    def _weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+        """Value where the cumulative weight first reaches half the total"""
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, cumulative[-1] / 2)
+        return float(values[order][index])
+    
+    def _get_geometric_detection(
+        self,
+        commit_margin: Optional[float] = None,
+        commit_spread: Optional[float] = None
+    ) -> Optional[FusedDetection]:
+        """
+        Fuse buffered tip positions into one board position and score it.
+        
+        Args:
+            commit_margin: If set, inlier confidence must beat outlier
+                           confidence by this much (early commit)
+            commit_spread: If set, enough inliers from two or more cameras
+                           must lie within this per-axis standard deviation
+                           of the fused tip (early commit)
+        
+        Returns:
+            FusedDetection, or None if the samples don't agree well enough
+        """
+        samples = [det for frame_detections in self.detection_buffer for det in frame_detections]
+        xs = np.array([det.x for det in samples], dtype=np.float64)
+        ys = np.array([det.y for det in samples], dtype=np.float64)
+        weights = np.array([det.confidence for det in samples], dtype=np.float64)
+        
+        # Robust center, then reject samples far from it
+        median_x = self._weighted_median(xs, weights)
+        median_y = self._weighted_median(ys, weights)
+        inliers = np.hypot(xs - median_x, ys - median_y) <= self.outlier_radius
+        
+        inlier_weight = float(weights[inliers].sum())
+        outlier_weight = float(weights[~inliers].sum())
+        agreement = inlier_weight / (inlier_weight + outlier_weight)
+        
+        if agreement < self.min_agreement:
+            logger.debug(f"Low geometric agreement: {agreement:.2f} < {self.min_agreement}")
+            return None
+        
+        if commit_margin is not None and inlier_weight - outlier_weight < commit_margin:
+            return None
+        
+        # Weighted mean of the inliers is the fused tip
+        fused_x = int(round(float(np.average(xs[inliers], weights=weights[inliers]))))
+        fused_y = int(round(float(np.average(ys[inliers], weights=weights[inliers]))))
+        cameras = {det.camera_id for det, inlier in zip(samples, inliers) if inlier}
+        
+        if commit_spread is not None:
+            if int(inliers.sum()) < self.GEOMETRIC_COMMIT_SAMPLES or len(cameras) < 2:
+                return None
+            spread_x = np.sqrt(np.average((xs[inliers] - fused_x) ** 2, weights=weights[inliers]))
+            spread_y = np.sqrt(np.average((ys[inliers] - fused_y) ** 2, weights=weights[inliers]))
+            if max(spread_x, spread_y) > commit_spread:
+                return None
+        
+        segment, value, multiplier = self.score_calculator.lookup_score(fused_x, fused_y)
+        
+        return FusedDetection(
+            segment=segment,
+            value=value,
+            multiplier=multiplier,
+            confidence=inlier_weight / int(inliers.sum()),
+            num_cameras=len(cameras),
+            agreement=agreement,
+            x=fused_x,
+            y=fused_y
+        )
+    
+    def _build_fused(self, segment: str, agreement: float) -> FusedDetection:
+        """Build the fused result for a winning segment from the running totals"""
+        count = self.segment_counts[segment]
+        
         # Calculate average confidence for winning segment
-        avg_confidence = sum(segment_confidences[most_common_segment]) / len(segment_confidences[most_common_segment])
+        avg_confidence = self.confidence_sums[segment] / count
         
         # Parse segment to get value and multiplier
-        value, multiplier = self._parse_segment(most_common_segment)
+        value, multiplier = self._parse_segment(segment)
         
         # Count unique cameras that detected this segment
-        cameras_detected = set()
-        for frame_detections in self.detection_buffer:
-            for det in frame_detections:
-                if det.segment == most_common_segment:
-                    cameras_detected.add(det.camera_id)
+        cameras_detected = self.segment_cameras[segment]
         
         return FusedDetection(
-            segment=most_common_segment,
+            segment=segment,
             value=value,
             multiplier=multiplier,
             confidence=avg_confidence,
@@ -171,6 +369,10 @@ class MultiCameraFusion:
     def reset_buffer(self):
         """Clear detection buffer (call after dart confirmed)"""
         self.detection_buffer.clear()
+        self.segment_counts.clear()
+        self.confidence_sums.clear()
+        self.segment_cameras.clear()
+        self.total_detections = 0
     
     def instant_fusion(self, detections: List[CameraDetection]) -> Optional[FusedDetection]:
         """
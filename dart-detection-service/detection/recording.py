@@ -0,0 +1,350 @@
+"""
+Frame Recording and Replay
+Records the frames the detector reads (plus emitted events) to disk, and
+replays them through a CameraManager-compatible source so detection can
+be profiled and reproduced offline without the board.
+
+On-disk format (one directory per session):
+    meta.json      Cameras, codec, start time
+    cam<N>.bin     Encoded frames for camera N, back to back
+    index.bin      Fixed-size records: tick, camera, sequence, timestamp, offset, length
+    events.jsonl   Emitted events with the tick they were emitted on
+"""
+import cv2
+import numpy as np
+import json
+import logging
+import mmap
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .camera_manager import CapturedFrame
+
+logger = logging.getLogger(__name__)
+
+# tick, camera, sequence, timestamp (seconds since recording start), offset, length
+INDEX_RECORD = struct.Struct("<IHIdQI")
+
+CODECS = {
+    "png": (".png", [cv2.IMWRITE_PNG_COMPRESSION, 1]),  # Lossless, exact replay
+    "jpg": (".jpg", [cv2.IMWRITE_JPEG_QUALITY, 95]),    # Smaller, for long sessions
+}
+
+
+class FrameRecorder:
+    """
+    Records frames and events to a session directory.
+    
+    Frames are queued and encoded on a background writer thread, so
+    record_frame never blocks the detection path. If the writer falls
+    behind, frames are dropped and counted rather than queued forever.
+    
+    Frames are grouped into ticks: a camera recording a second frame
+    starts a new tick, matching one detector iteration reading every
+    camera once.
+    """
+    
+    def __init__(self, path: str, camera_indices: list[int], codec: str = "png", max_queue: int = 64):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.camera_indices = camera_indices
+        self.codec = codec
+        
+        self.tick = 0
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._tick_cameras: set[int] = set()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        
+        # Last written (sequence, offset, length) per camera, so repeated
+        # reads of the same capture point at the existing bytes
+        self._last_written: dict[int, tuple[int, int, int]] = {}
+        self._offsets: dict[int, int] = {cam: 0 for cam in camera_indices}
+        
+        self._frame_files = {cam: open(self.path / f"cam{cam}.bin", "wb") for cam in camera_indices}
+        self._index_file = open(self.path / "index.bin", "wb")
+        self._events_file = open(self.path / "events.jsonl", "w")
+        
+        with open(self.path / "meta.json", "w") as f:
+            json.dump({
+                "cameras": camera_indices,
+                "codec": codec,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "version": 1
+            }, f)
+        
+        self._writer = threading.Thread(target=self._write_loop, name="frame-recorder", daemon=True)
+        self._writer.start()
+        
+        logger.info(f"Recording frames to {self.path} ({codec})")
+    
+    def record_frame(self, camera_id: int, captured: CapturedFrame):
+        """Queue a frame the detector just read (non-blocking)"""
+        with self._lock:
+            if self._closed:
+                self.frames_dropped += 1
+                return
+            if camera_id in self._tick_cameras:
+                self.tick += 1
+                self._tick_cameras.clear()
+            self._tick_cameras.add(camera_id)
+            tick = self.tick
+            
+            # Queued under the lock, so nothing lands behind close()'s stop marker
+            try:
+                self._queue.put_nowait(("frame", tick, camera_id, captured))
+            except queue.Full:
+                self.frames_dropped += 1
+    
+    def record_event(self, event: dict):
+        """Queue an emitted event, tagged with the current tick"""
+        with self._lock:
+            if self._closed:
+                logger.warning("Recorder closed - event not recorded")
+                return
+            try:
+                self._queue.put_nowait(("event", self.tick, event))
+            except queue.Full:
+                logger.warning("Recorder queue full - event not recorded")
+    
+    def _write_loop(self):
+        """Background writer: encode frames and append to the session files"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            try:
+                if item[0] == "event":
+                    _, tick, event = item
+                    self._events_file.write(json.dumps({"tick": tick, **event}, default=str) + "\n")
+                else:
+                    _, tick, camera_id, captured = item
+                    self._write_frame(tick, camera_id, captured)
+            except Exception as e:
+                logger.error(f"Recording write failed: {e}")
+    
+    def _write_frame(self, tick: int, camera_id: int, captured: CapturedFrame):
+        """Encode (unless unchanged) and index one frame"""
+        last = self._last_written.get(camera_id)
+        
+        if last is not None and last[0] == captured.sequence:
+            _, offset, length = last
+        else:
+            extension, params = CODECS[self.codec]
+            ok, encoded = cv2.imencode(extension, captured.frame, params)
+            if not ok:
+                return
+            
+            data = encoded.tobytes()
+            offset = self._offsets[camera_id]
+            length = len(data)
+            self._frame_files[camera_id].write(data)
+            self._offsets[camera_id] = offset + length
+            self._last_written[camera_id] = (captured.sequence, offset, length)
+        
+        self._index_file.write(INDEX_RECORD.pack(
+            tick, camera_id, captured.sequence, captured.timestamp - self._start, offset, length
+        ))
+        self.frames_recorded += 1
+    
+    def close(self):
+        """
+        Write everything queued, then close the session files (blocking -
+        call from a worker thread).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        
+        # The writer drains the queue up to the stop marker and exits; files
+        # are only closed once it can no longer touch them
+        self._queue.put(None)
+        self._writer.join()
+        
+        for f in self._frame_files.values():
+            f.close()
+        self._index_file.close()
+        self._events_file.close()
+        
+        logger.info(f"Recording closed: {self.frames_recorded} frames, {self.frames_dropped} dropped")
+
+
+class ReplayCameraManager:
+    """
+    Plays a recorded session back through the CameraManager interface.
+    
+    Modes:
+    - realtime: the current tick follows the wall clock, like live cameras
+    - max speed: every detector iteration gets the next tick, so a
+      replay is deterministic and runs as fast as the pipeline allows
+    """
+    
+    def __init__(self, path: str, realtime: bool = True):
+        self.path = Path(path)
+        self.realtime = realtime
+        
+        with open(self.path / "meta.json") as f:
+            self.meta = json.load(f)
+        
+        # ticks[i] = {camera_id: (sequence, timestamp, offset, length)}
+        self.ticks: list[dict[int, tuple[int, float, int, int]]] = []
+        self.tick_times: list[float] = []
+        self._load_index()
+        
+        self.cameras: dict[int, object] = {}
+        self._frame_maps: dict[int, mmap.mmap] = {}
+        self._frame_files = {}
+        
+        self._lock = threading.Lock()
+        self._current = 0
+        self._tick_reads: set[int] = set()
+        self._decoded: dict[int, tuple[int, np.ndarray]] = {}  # camera -> (sequence, frame)
+        self._start: Optional[float] = None
+        
+        logger.info(f"Replay loaded: {len(self.ticks)} ticks from {self.path}")
+    
+    def _load_index(self):
+        """Read the whole index (small) into per-tick dicts"""
+        data = (self.path / "index.bin").read_bytes()
+        
+        for tick, camera_id, sequence, timestamp, offset, length in INDEX_RECORD.iter_unpack(data):
+            while len(self.ticks) <= tick:
+                self.ticks.append({})
+                self.tick_times.append(timestamp)
+            self.ticks[tick][camera_id] = (sequence, timestamp, offset, length)
+        
+        # A tick's time is its first frame's timestamp
+        for i, frames in enumerate(self.ticks):
+            if frames:
+                self.tick_times[i] = min(entry[1] for entry in frames.values())
+    
+    def load_events(self) -> list[dict]:
+        """Events that were emitted during the recording"""
+        events_path = self.path / "events.jsonl"
+        if not events_path.exists():
+            return []
+        with open(events_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def get_available_cameras(self, max_index: int = 10) -> list[int]:
+        """Cameras present in the recording"""
+        return list(self.meta["cameras"])
+    
+    def open_camera(self, index: int, width: int = 640, height: int = 480, fps: int = 30):
+        """Open a recorded camera stream (resolution is whatever was recorded)"""
+        if index not in self.meta["cameras"]:
+            raise RuntimeError(f"Camera {index} not in recording")
+        
+        frame_path = self.path / f"cam{index}.bin"
+        self._frame_files[index] = open(frame_path, "rb")
+        if frame_path.stat().st_size > 0:
+            self._frame_maps[index] = mmap.mmap(self._frame_files[index].fileno(), 0, access=mmap.ACCESS_READ)
+        
+        self.cameras[index] = frame_path
+        return frame_path
+    
+    def wait_for_frames(self, timeout: float = 1.0) -> bool:
+        """Recorded frames are always available"""
+        return True
+    
+    def is_exhausted(self) -> bool:
+        """True once every recorded tick has been served"""
+        if not self.ticks:
+            return True
+        if self._start is None:
+            return False
+        
+        if self.realtime:
+            return time.monotonic() - self._start + self.tick_times[0] > self.tick_times[-1]
+        
+        return self._current >= len(self.ticks) - 1 and self.cameras.keys() <= self._tick_reads
+    
+    def _current_tick(self) -> int:
+        """Tick to serve now"""
+        if not self.realtime:
+            return self._current
+        
+        if self._start is None:
+            return 0
+        
+        # Last tick whose recorded time has passed
+        elapsed = time.monotonic() - self._start + self.tick_times[0]
+        tick = int(np.searchsorted(self.tick_times, elapsed, side='right')) - 1
+        return max(0, min(tick, len(self.ticks) - 1))
+    
+    def get_latest_frame(self, index: int) -> Optional[CapturedFrame]:
+        """Frame for this camera at the current replay tick"""
+        if index not in self.cameras or not self.ticks:
+            return None
+        
+        with self._lock:
+            if self._start is None:
+                self._start = time.monotonic()
+            
+            # Max speed: a camera read twice means the detector moved on
+            if not self.realtime and index in self._tick_reads:
+                if self._current >= len(self.ticks) - 1:
+                    return None
+                self._current += 1
+                self._tick_reads.clear()
+            self._tick_reads.add(index)
+            
+            entry = self.ticks[self._current_tick()].get(index)
+        
+        if entry is None:
+            return None
+        
+        sequence, timestamp, offset, length = entry
+        return CapturedFrame(self._decode(index, sequence, offset, length), self._start + timestamp, sequence)
+    
+    def _decode(self, index: int, sequence: int, offset: int, length: int) -> np.ndarray:
+        """Decode a recorded frame, reusing the last decode for repeated captures"""
+        cached = self._decoded.get(index)
+        if cached is not None and cached[0] == sequence:
+            return cached[1]
+        
+        data = np.frombuffer(self._frame_maps[index], dtype=np.uint8, count=length, offset=offset)
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        self._decoded[index] = (sequence, frame)
+        return frame
+    
+    def read_frame(self, index: int) -> Optional[tuple[bool, any]]:
+        """Read the frame at the current tick"""
+        captured = self.get_latest_frame(index)
+        if captured is None:
+            return False, None
+        return True, captured.frame
+    
+    def release_camera(self, index: int):
+        """Close a recorded camera stream"""
+        self.cameras.pop(index, None)
+        self._decoded.pop(index, None)
+        
+        frame_map = self._frame_maps.pop(index, None)
+        if frame_map is not None:
+            frame_map.close()
+        frame_file = self._frame_files.pop(index, None)
+        if frame_file is not None:
+            frame_file.close()
+    
+    def release_all(self):
+        """Close all recorded camera streams"""
+        for index in list(self.cameras.keys()):
+            self.release_camera(index)
+    
+    def is_camera_open(self, index: int) -> bool:
+        """Check if a recorded camera stream is open"""
+        return index in self.cameras
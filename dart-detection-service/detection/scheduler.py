@@ -0,0 +1,162 @@
+"""
+Frame Scheduler
+Paces the detection loop against the camera frame clock instead of
+sleeping a fixed interval after every iteration.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from .metrics import LOOP_LAG_SECONDS, LOOP_OVERRUNS
+
+
+class FrameScheduler:
+    """
+    Decides when the next detection iteration should run.
+    
+    Each camera's frame clock (last capture timestamp and an estimated
+    frame period) is tracked from the frames the detector reads. The next
+    iteration is scheduled just after every camera is due a new frame, so
+    a fast pipeline waits for fresh frames and a slow one runs back to back
+    on whatever is newest, never working through a backlog.
+    
+    An iteration that found no new frame polls again after a quarter
+    period. Without frame timestamps the loop falls back to a fixed-rate
+    deadline.
+    An interval of 0 disables pacing (max-speed replay).
+    """
+    
+    def __init__(self, interval: float = 0.033, settle: float = 0.002, window: int = 60):
+        """
+        Args:
+            interval: Nominal frame period (seconds), 0 = unpaced
+            settle: Delay after a frame is due before waking (seconds)
+            window: Iterations used for the achieved-FPS estimate
+        """
+        self.interval = interval
+        self.settle = settle
+        
+        # camera -> (timestamp, sequence, estimated period)
+        self.frame_clocks: dict[int, tuple[float, int, float]] = {}
+        
+        self.iterations = 0
+        self.overruns = 0
+        self.lag_last = 0.0
+        self.lag_avg = 0.0
+        self.lag_max = 0.0
+        
+        self._iteration_start: Optional[float] = None
+        self._fresh = False  # A new frame was observed during this iteration
+        self._deadline: Optional[float] = None
+        self._starts: deque[float] = deque(maxlen=window)
+    
+    def observe_frame(self, cam_idx: int, timestamp: float, sequence: int):
+        """Feed a frame read by the detector into that camera's clock"""
+        previous = self.frame_clocks.get(cam_idx)
+        period = self.interval
+        
+        if previous is not None:
+            last_timestamp, last_sequence, period = previous
+            if sequence <= last_sequence:
+                return
+            measured = (timestamp - last_timestamp) / (sequence - last_sequence)
+            if measured > 0:
+                period = period * 0.9 + measured * 0.1 if period > 0 else measured
+        
+        self.frame_clocks[cam_idx] = (timestamp, sequence, period)
+        self._fresh = True
+    
+    def frame_time(self) -> Optional[float]:
+        """
+        Capture timestamp of the newest frame observed from any camera.
+        
+        Replays carry their recorded timestamps, so time measured on this
+        clock is the same however fast the replay runs.
+        """
+        if not self.frame_clocks:
+            return None
+        return max(timestamp for timestamp, _, _ in self.frame_clocks.values())
+    
+    def frame_period(self) -> float:
+        """Slowest camera's estimated frame period (nominal interval if unknown)"""
+        periods = [period for _, _, period in self.frame_clocks.values() if period > 0]
+        return max(periods) if periods else self.interval
+    
+    def begin_iteration(self):
+        """Mark the start of a detection iteration"""
+        self._iteration_start = time.monotonic()
+        self._starts.append(self._iteration_start)
+        self.iterations += 1
+        self._fresh = False
+    
+    def _next_deadline(self, now: float) -> float:
+        """When the next iteration should start"""
+        period = self.frame_period()
+        
+        if self.frame_clocks:
+            if not self._fresh:
+                # Last iteration found nothing new (late or stalled camera) - poll again shortly
+                return now + period / 4
+            
+            # Just after the last camera to deliver is due its next frame
+            due = max(timestamp + clock_period for timestamp, _, clock_period in self.frame_clocks.values())
+            due += self.settle
+            
+            # Already past it: a newer frame is waiting, run on it now
+            return min(due, now + period) if due > now else now
+        
+        # No frame timestamps - fixed rate
+        base = self._deadline if self._deadline is not None and self._deadline > now - period else now
+        return base + period
+    
+    async def wait(self):
+        """Sleep until the next iteration is due, recording overruns and loop lag"""
+        if self.interval <= 0:
+            await asyncio.sleep(0)
+            return
+        
+        now = time.monotonic()
+        
+        if self._iteration_start is not None and now - self._iteration_start > self.frame_period():
+            self.overruns += 1
+            LOOP_OVERRUNS.inc()
+        
+        deadline = self._next_deadline(now)
+        self._deadline = deadline
+        
+        if deadline <= now:
+            await asyncio.sleep(0)
+            return
+        
+        await asyncio.sleep(deadline - now)
+        
+        # Event-loop lag: how late the sleep actually woke up
+        lag = max(0.0, time.monotonic() - deadline)
+        LOOP_LAG_SECONDS.observe(lag)
+        self.lag_last = lag
+        self.lag_avg = self.lag_avg * 0.9 + lag * 0.1
+        self.lag_max = max(self.lag_max, lag)
+    
+    def achieved_fps(self) -> Optional[float]:
+        """Iterations per second over the recent window"""
+        if len(self._starts) < 2:
+            return None
+        elapsed = self._starts[-1] - self._starts[0]
+        return (len(self._starts) - 1) / elapsed if elapsed > 0 else None
+    
+    def get_stats(self) -> dict:
+        """Scheduler statistics for /stats"""
+        fps = self.achieved_fps()
+        return {
+            "target_fps": round(1 / self.interval, 1) if self.interval > 0 else None,
+            "camera_fps": round(1 / self.frame_period(), 1) if self.frame_period() > 0 else None,
+            "achieved_fps": round(fps, 1) if fps is not None else None,
+            "iterations": self.iterations,
+            "overruns": self.overruns,
+            "loop_lag_ms": {
+                "last": round(self.lag_last * 1000, 2),
+                "avg": round(self.lag_avg * 1000, 2),
+                "max": round(self.lag_max * 1000, 2)
+            }
+        }
@@ -9,8 +9,13 @@ import logging
 from typing import Tuple, Optional
 from dataclasses import dataclass
 
+from .artifact_cache import ArtifactCache, artifact_key
+
 logger = logging.getLogger(__name__)
 
+# Lookup tables shared between calculators with identical geometry
+_LOOKUP_CACHE: dict[tuple, np.ndarray] = {}
+
 
 @dataclass
 class ScoreResult:
@@ -22,6 +27,20 @@ class ScoreResult:
     angle: float   # Angle in degrees
 
 
+@dataclass
+class ScoreBatch:
+    """Parallel arrays from batch score calculation (one entry per point)"""
+    codes: np.ndarray        # uint8 score codes (see ScoreCalculator.CODE_SCORES)
+    value: np.ndarray        # int
+    multiplier: np.ndarray   # int
+    radius: np.ndarray       # float, distance from center
+    angle: np.ndarray        # float, degrees clockwise from top
+    
+    def segments(self) -> list[str]:
+        """Segment strings (allocates one str per point - avoid on hot paths)"""
+        return [ScoreCalculator.CODE_SCORES[code][0] for code in self.codes]
+
+
 class ScoreCalculator:
     """
     Calculate dart score from (x, y) position on dartboard.
@@ -60,10 +79,29 @@ class ScoreCalculator:
         5: (333, 351)
     }
     
+    # Compact score codes stored in the lookup table:
+    # 0 = miss, 1-20 singles, 21-40 doubles, 41-60 triples, 61 = 25, 62 = BULL
+    MISS_CODE = 0
+    OUTER_BULL_CODE = 61
+    BULL_CODE = 62
+    
+    # (segment, value, multiplier) for every code
+    CODE_SCORES = (
+        [('0', 0, 1)]
+        + [(str(n), n, 1) for n in range(1, 21)]
+        + [(f'D{n}', n, 2) for n in range(1, 21)]
+        + [(f'T{n}', n, 3) for n in range(1, 21)]
+        + [('25', 25, 1), ('BULL', 50, 1)]
+    )
+    CODE_VALUES = np.array([score[1] for score in CODE_SCORES], dtype=np.int64)
+    CODE_MULTIPLIERS = np.array([score[2] for score in CODE_SCORES], dtype=np.int64)
+    
     def __init__(
         self,
         center: Tuple[int, int],
-        ring_radii: dict
+        ring_radii: dict,
+        size: Optional[Tuple[int, int]] = None,
+        artifacts: Optional[ArtifactCache] = None
     ):
         """
         Initialize calculator with board geometry.
@@ -72,9 +110,156 @@ class ScoreCalculator:
             center: (x, y) center of dartboard in transformed image
             ring_radii: Dict with keys: bull_inner, bull_outer, triple_inner, 
                        triple_outer, double_inner, double_outer
+            size: (width, height) of board space covered by the lookup table
+                  (defaults to twice the center, i.e. 800x800 for (400, 400))
+            artifacts: Persist the lookup table here and memory-map it on later starts
         """
         self.center = center
         self.radii = ring_radii
+        self.size = size or (center[0] * 2, center[1] * 2)
+        self.artifacts = artifacts
+        
+        self.lookup_table = self._get_lookup_table()
+    
+    @classmethod
+    def encode(cls, segment_num: int, multiplier: int) -> int:
+        """Encode a numbered segment and multiplier as a score code"""
+        return (multiplier - 1) * 20 + segment_num
+    
+    def _get_lookup_table(self) -> np.ndarray:
+        """Get the lookup table for this geometry, loading or building it once per process"""
+        key = (tuple(self.center), tuple(sorted(self.radii.items())), tuple(self.size))
+        
+        table = _LOOKUP_CACHE.get(key)
+        if table is not None:
+            return table
+        
+        name = artifact_key("score_lut", key)
+        loaded = self.artifacts.load(name) if self.artifacts else None
+        if loaded is not None:
+            table = loaded[0]
+        else:
+            table = self._build_lookup_table()
+            if self.artifacts:
+                self.artifacts.save(name, {"data": table})
+        
+        _LOOKUP_CACHE[key] = table
+        return table
+    
+    def _build_lookup_table(self) -> np.ndarray:
+        """
+        Build a uint8 image mapping each board pixel to a score code.
+        
+        Uses the same comparisons as the analytic path so every integer
+        pixel classifies identically.
+        """
+        width, height = self.size
+        ys, xs = np.mgrid[0:height, 0:width]
+        
+        radius, angle = self.calculate_polar_array(xs, ys)
+        codes = self._classify_array(radius, angle)
+        
+        logger.info(f"Built score lookup table {width}x{height}")
+        return codes
+    
+    def calculate_polar_array(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized calculate_polar - same float64 operations, element-wise.
+        
+        Returns:
+            (radius, angle_degrees) arrays
+        """
+        dx = (xs - self.center[0]).astype(np.float64)
+        dy = (ys - self.center[1]).astype(np.float64)
+        radius = np.sqrt(dx * dx + dy * dy)
+        angle = (np.degrees(np.arctan2(dy, dx)) + 90) % 360
+        return radius, angle
+    
+    def _classify_array(self, radius: np.ndarray, angle: np.ndarray) -> np.ndarray:
+        """Vectorized analytic classification into uint8 score codes"""
+        # Segment index: number of boundaries (9, 27, ..., 351) <= angle,
+        # wrapped so everything from 351 round to 9 lands on 20
+        boundaries = np.arange(9, 360, 18, dtype=np.float64)
+        sector = np.searchsorted(boundaries, angle, side='right') % 20
+        segment_nums = np.array(self.SEGMENTS)[sector]
+        
+        r = self.radii
+        codes = np.select(
+            [
+                radius <= r['bull_inner'],
+                radius <= r['bull_outer'],
+                radius > r['double_outer'],
+                (radius >= r['triple_inner']) & (radius <= r['triple_outer']),
+                (radius >= r['double_inner']) & (radius <= r['double_outer']),
+            ],
+            [
+                self.BULL_CODE,
+                self.OUTER_BULL_CODE,
+                self.MISS_CODE,
+                segment_nums + 40,
+                segment_nums + 20,
+            ],
+            default=segment_nums
+        ).astype(np.uint8)
+        
+        return codes
+    
+    def calculate_scores(
+        self,
+        points: np.ndarray,
+        compensation_factor: Optional[float] = None
+    ) -> ScoreBatch:
+        """
+        Score many board positions at once without a Python-level loop.
+        
+        Gives the same segment, value, multiplier and radius as calculate_score
+        (or calculate_score_with_tip_compensation when compensation_factor is
+        set) for every point. Angles can differ in the last bit because numpy's
+        arctan2 is not libm's.
+        
+        Args:
+            points: Nx2 array of integer (x, y) board coordinates
+            compensation_factor: Optional dart tip compensation
+            
+        Returns:
+            ScoreBatch of parallel arrays
+        """
+        points = np.asarray(points).reshape(-1, 2)
+        xs = points[:, 0]
+        ys = points[:, 1]
+        
+        if compensation_factor is not None:
+            # Same float math and int() truncation as the scalar version
+            xs = xs.astype(np.float64)
+            ys = ys.astype(np.float64)
+            xs = np.trunc(xs + (xs - self.center[0]) * compensation_factor)
+            ys = np.trunc(ys + (ys - self.center[1]) * compensation_factor)
+        
+        xs = xs.astype(np.int64)
+        ys = ys.astype(np.int64)
+        
+        radius, angle = self.calculate_polar_array(xs, ys)
+        
+        # Table lookup inside the board image, analytic classification outside
+        width, height = self.size
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        codes = np.empty(len(xs), dtype=np.uint8)
+        codes[inside] = self.lookup_table[ys[inside], xs[inside]]
+        if not inside.all():
+            outside = ~inside
+            codes[outside] = self._classify_array(radius[outside], angle[outside])
+        
+        return ScoreBatch(
+            codes=codes,
+            value=self.CODE_VALUES[codes],
+            multiplier=self.CODE_MULTIPLIERS[codes],
+            radius=radius,
+            angle=angle
+        )
     
     def calculate_polar(
         self, 
@@ -97,13 +282,13 @@ class ScoreCalculator:
         radius = math.sqrt(dx*dx + dy*dy)
         
         # Calculate angle (0° at top, clockwise)
-        # atan2 gives angle from positive x-axis, counterclockwise
-        # We need to convert to clockwise from top
+        # Image y points down, so atan2 gives the angle from the positive
+        # x-axis measured clockwise on screen
         angle_rad = math.atan2(dy, dx)
         angle_deg = math.degrees(angle_rad)
         
         # Convert to clockwise from top: 0° = top, 90° = right
-        angle_deg = (90 - angle_deg) % 360
+        angle_deg = (angle_deg + 90) % 360
         
         return radius, angle_deg
     
@@ -129,13 +314,69 @@ class ScoreCalculator:
         logger.warning(f"No segment found for angle {angle}")
         return 20
     
+    def lookup_code(self, x: int, y: int) -> int:
+        """
+        Get the score code for an integer board position.
+        
+        A single table index inside the board image; points outside it
+        fall back to the analytic path.
+        """
+        if 0 <= x < self.size[0] and 0 <= y < self.size[1]:
+            return int(self.lookup_table[y, x])
+        
+        return self._code_for(self.calculate_score_analytic(x, y))
+    
+    def lookup_score(self, x: int, y: int) -> Tuple[str, int, int]:
+        """
+        Fast path: get (segment, value, multiplier) without polar coordinates.
+        """
+        return self.CODE_SCORES[self.lookup_code(x, y)]
+    
+    def _code_for(self, result: ScoreResult) -> int:
+        """Score code for an analytic result"""
+        if result.segment == 'BULL':
+            return self.BULL_CODE
+        if result.segment == '25':
+            return self.OUTER_BULL_CODE
+        if result.value == 0:
+            return self.MISS_CODE
+        return self.encode(result.value, result.multiplier)
+    
     def calculate_score(
         self,
         x: int,
         y: int
     ) -> ScoreResult:
         """
-        Calculate score from dart position.
+        Calculate score from dart position using the lookup table.
+        
+        Args:
+            x: X coordinate in board space
+            y: Y coordinate in board space
+            
+        Returns:
+            ScoreResult with segment, value, multiplier
+        """
+        segment, value, multiplier = self.lookup_score(x, y)
+        radius, angle = self.calculate_polar(x, y)
+        
+        return ScoreResult(
+            segment=segment,
+            value=value,
+            multiplier=multiplier,
+            radius=radius,
+            angle=angle
+        )
+    
+    def calculate_score_analytic(
+        self,
+        x: int,
+        y: int
+    ) -> ScoreResult:
+        """
+        Calculate score from dart position using polar geometry.
+        
+        Reference implementation the lookup table is built to match.
         
         Args:
             x: X coordinate in board space
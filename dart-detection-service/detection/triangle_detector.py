@@ -6,9 +6,12 @@ Based on LarsG21/Darts_Project approach with optimizations.
 import cv2
 import numpy as np
 import logging
+import time
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
 
+from .metrics import STAGE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,8 +31,19 @@ class TriangleDartDetector:
     
     The dart shaft creates a triangular shape in difference images.
     We find the tip by identifying the point opposite the shortest side.
+    
+    With pyramid_levels > 0, candidate contours are found on a half
+    (1) or quarter (2) resolution diff, and triangle fitting re-runs at
+    full resolution only inside small ROIs around those candidates.
     """
     
+    # Extra full-resolution pixels around a coarse candidate, enough for
+    # the blur and dilation passes to see the whole shape
+    ROI_MARGIN = 24
+    
+    # Deepest coarse level accepted (2 = quarter resolution)
+    MAX_PYRAMID_LEVELS = 2
+    
     def __init__(
         self,
         min_area: int = 100,
@@ -38,7 +52,8 @@ class TriangleDartDetector:
         canny_high: int = 150,
         gauss_filters: int = 2,
         dilations: int = 6,
-        erosions: int = 2
+        erosions: int = 2,
+        pyramid_levels: int = 0
     ):
         """
         Initialize detector with filtering parameters.
@@ -51,6 +66,7 @@ class TriangleDartDetector:
             gauss_filters: Number of Gaussian blur passes
             dilations: Dilation iterations
             erosions: Erosion iterations
+            pyramid_levels: Coarse detection levels (0 = full resolution only)
         """
         self.min_area = min_area
         self.max_area = max_area
@@ -59,20 +75,36 @@ class TriangleDartDetector:
         self.gauss_filters = gauss_filters
         self.dilations = dilations
         self.erosions = erosions
+        self.pyramid_levels = pyramid_levels
     
-    def find_contours(self, diff_image: np.ndarray) -> List[np.ndarray]:
+    def find_contours(
+        self,
+        diff_image: np.ndarray,
+        scale: float = 1.0,
+        area_slack: float = 1.0
+    ) -> List[np.ndarray]:
         """
         Find contours in difference image using Canny edge detection.
         
         Args:
             diff_image: Grayscale difference image
+            scale: Resolution of diff_image relative to full size; area
+                   limits and morphology are scaled to match
+            area_slack: Widen the area limits by this factor (coarse passes
+                        over-accept and let the full-resolution pass filter)
             
         Returns:
             List of contours (each is numpy array of points)
         """
+        min_area = self.min_area * scale * scale / area_slack
+        max_area = self.max_area * scale * scale * area_slack
+        dilations = max(1, round(self.dilations * scale))
+        erosions = round(self.erosions * scale)
+        gauss_filters = self.gauss_filters if scale >= 1.0 else 1  # pyrDown already smooths
+        
         # Apply Gaussian blur to reduce noise
         blurred = diff_image.copy()
-        for _ in range(self.gauss_filters):
+        for _ in range(gauss_filters):
             blurred = cv2.GaussianBlur(blurred, (11, 11), 1)
         
         # Canny edge detection
@@ -80,8 +112,8 @@ class TriangleDartDetector:
         
         # Morphological operations to close gaps
         kernel = np.ones((3, 3), np.uint8)
-        dilated = cv2.dilate(edges, kernel, iterations=self.dilations)
-        processed = cv2.erode(dilated, kernel, iterations=self.erosions)
+        dilated = cv2.dilate(edges, kernel, iterations=dilations)
+        processed = cv2.erode(dilated, kernel, iterations=erosions) if erosions else dilated
         
         # Find contours
         contours, _ = cv2.findContours(
@@ -94,7 +126,7 @@ class TriangleDartDetector:
         filtered = []
         for contour in contours:
             area = cv2.contourArea(contour)
-            if self.min_area < area < self.max_area:
+            if min_area < area < max_area:
                 filtered.append(contour)
         
         # Sort by area (largest first)
@@ -162,10 +194,30 @@ class TriangleDartDetector:
             # Base is pt1-pt2, tip is pt3
             return pt3, [pt1, pt2]
     
+    def find_candidates(self, diff_image: np.ndarray, top_n: int = 3) -> List[np.ndarray]:
+        """
+        Contours detect_dart considers for a difference image.
+        
+        Args:
+            diff_image: Grayscale difference from reference
+            top_n: Number of detections that will be asked for
+            
+        Returns:
+            List of contours sorted by area (largest first)
+        """
+        start = time.perf_counter()
+        if self.pyramid_levels > 0:
+            contours = self.find_contours_pyramid(diff_image, top_n * 2)
+        else:
+            contours = self.find_contours(diff_image)
+        STAGE_SECONDS.observe_since(start, "find_contours")
+        return contours
+    
     def detect_dart(
         self, 
         diff_image: np.ndarray,
-        top_n: int = 3
+        top_n: int = 3,
+        contours: Optional[List[np.ndarray]] = None
     ) -> List[DartDetection]:
         """
         Detect dart tip in difference image.
@@ -173,11 +225,13 @@ class TriangleDartDetector:
         Args:
             diff_image: Grayscale difference from reference
             top_n: Number of top candidates to return
+            contours: find_candidates() output for this image, if already computed
             
         Returns:
             List of DartDetection objects, sorted by confidence
         """
-        contours = self.find_contours(diff_image)
+        if contours is None:
+            contours = self.find_candidates(diff_image, top_n)
         
         if not contours:
             return []
@@ -186,7 +240,9 @@ class TriangleDartDetector:
         
         # Try to fit triangles to top contours
         for contour in contours[:top_n * 2]:  # Check more than needed
+            start = time.perf_counter()
             triangle = self.fit_triangle(contour)
+            STAGE_SECONDS.observe_since(start, "fit_triangle")
             
             if triangle is not None:
                 # Find dart tip
@@ -215,6 +271,59 @@ class TriangleDartDetector:
         
         return detections[:top_n]
     
+    def find_contours_pyramid(self, diff_image: np.ndarray, max_candidates: int) -> List[np.ndarray]:
+        """
+        Coarse-to-fine contour search.
+        
+        Finds candidates on a downscaled diff, then runs full-resolution
+        contour finding only inside an ROI around each one. Returned
+        contours are in full-resolution coordinates.
+        
+        Args:
+            diff_image: Full-resolution grayscale difference image
+            max_candidates: Number of coarse candidates to refine
+            
+        Returns:
+            List of contours sorted by area (largest first)
+        """
+        coarse = diff_image
+        for _ in range(self.pyramid_levels):
+            coarse = cv2.pyrDown(coarse)
+        
+        factor = 2 ** self.pyramid_levels
+        candidates = self.find_contours(coarse, scale=1.0 / factor, area_slack=4.0)
+        
+        height, width = diff_image.shape[:2]
+        refined = []
+        seen = set()
+        
+        for candidate in candidates[:max_candidates]:
+            x, y, w, h = cv2.boundingRect(candidate)
+            x0 = max(0, x * factor - self.ROI_MARGIN)
+            y0 = max(0, y * factor - self.ROI_MARGIN)
+            x1 = min(width, (x + w) * factor + self.ROI_MARGIN)
+            y1 = min(height, (y + h) * factor + self.ROI_MARGIN)
+            
+            roi = diff_image[y0:y1, x0:x1]
+            for contour in self.find_contours(roi):
+                rx, ry, rw, rh = cv2.boundingRect(contour)
+                
+                # Shapes cut by the ROI edge belong to another candidate
+                clipped = (
+                    (rx == 0 and x0 > 0) or (ry == 0 and y0 > 0)
+                    or (rx + rw == x1 - x0 and x1 < width)
+                    or (ry + rh == y1 - y0 and y1 < height)
+                )
+                key = (rx + x0, ry + y0, rw, rh)
+                if clipped or key in seen:
+                    continue
+                
+                seen.add(key)
+                refined.append(contour + np.array([x0, y0], dtype=contour.dtype))
+        
+        refined.sort(key=cv2.contourArea, reverse=True)
+        return refined
+    
     def visualize_detection(
         self,
         frame: np.ndarray,
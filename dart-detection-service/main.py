@@ -2,17 +2,29 @@
 MyDarts Custom Detection Service
 FastAPI server that detects dart throws using OpenCV and multiple cameras.
 """
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
+import base64
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import cv2
+
 from detection.dart_detector import DartDetector
 from detection.camera_manager import CameraManager
 from detection.click_calibrator import ClickCalibrator
 from detection.triangle_detector import TriangleDartDetector
+from detection.recording import FrameRecorder, ReplayCameraManager
+from detection.metrics import REGISTRY, STAGE_SECONDS
+from detection.debug_stream import DebugStream, MJPEG_BOUNDARY
+from detection.broadcaster import EventBroadcaster
+from detection.encoding import FORMATS, MSGPACK_SUBPROTOCOL
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +32,10 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="MyDarts Detection Service")
 
+# Working resolution of the warped board view (pixels per side).
+# Triangle detector area limits are tuned for 800 and scaled to match.
+BOARD_SIZE = int(os.environ.get("MYDARTS_BOARD_SIZE", "800"))
+
 # CORS for local development
 app.add_middleware(
     CORSMiddleware,
@@ -35,13 +51,34 @@ camera_manager: Optional[CameraManager] = None
 calibrator: Optional[ClickCalibrator] = None
 triangle_detector: Optional[TriangleDartDetector] = None
 
-# WebSocket connections
-active_connections: list[WebSocket] = []
+# WebSocket fan-out (bounded per-client queues, detection never awaits a socket)
+broadcaster = EventBroadcaster()
+
+# Live debug views (rendered only while someone is watching)
+debug_stream = DebugStream()
+
+# Snapshot/preview work (device reads, warping, JPEG encoding) runs here, off the event loop
+snapshot_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="snapshot")
 
 
 class StartRequest(BaseModel):
     camera_indices: list[int] = [0, 1, 2]  # Default to 3 cameras
     resolution: tuple[int, int] = (640, 480)
+    processing_mode: str = "threaded"  # "threaded" or "inline"
+    max_workers: Optional[int] = None  # Defaults to one worker per camera
+    detection_space: str = "board"  # "board" (warp frames) or "camera" (warp tips only)
+    motion_gate: bool = True
+    gate_pixel_threshold: int = 25  # Per-pixel change counted as motion
+    gate_min_fraction: float = 0.002  # Fraction of changed pixels that opens the gate
+    pyramid_levels: int = 0  # Coarse-to-fine triangle detection (0 = off, 1 = half, 2 = quarter)
+    fusion_commit_margin: Optional[float] = None  # Early-commit evidence bound, e.g. 2.0 (None = full window in vote mode)
+    fusion_mode: str = "vote"  # "vote" (segment strings) or "geometric" (fused tip position, commits early once cameras agree)
+    record_path: Optional[str] = None  # Record frames + events to this directory
+    record_codec: str = "png"  # "png" (lossless) or "jpg"
+    replay_path: Optional[str] = None  # Replay a recording instead of live cameras
+    replay_realtime: bool = True  # False = replay as fast as the pipeline runs
+    takeout_threshold: float = 1.0  # Seconds without a detection before a takeout event
+    background_alpha: float = 0.05  # Weight of each quiet frame in the adaptive background (0 = static)
 
 
 class CalibrationRequest(BaseModel):
@@ -53,8 +90,14 @@ async def startup_event():
     """Initialize camera manager on startup"""
     global camera_manager, calibrator, triangle_detector
     camera_manager = CameraManager()
-    calibrator = ClickCalibrator(target_size=(800, 800))
-    triangle_detector = TriangleDartDetector()
+    calibrator = ClickCalibrator(target_size=(BOARD_SIZE, BOARD_SIZE))
+    
+    area_scale = (BOARD_SIZE / 800) ** 2
+    triangle_detector = TriangleDartDetector(
+        min_area=int(100 * area_scale),
+        max_area=int(5000 * area_scale)
+    )
+    broadcaster.start()
     logger.info("Detection service started")
 
 
@@ -66,6 +109,10 @@ async def shutdown_event():
         await detector.stop()
     if camera_manager:
         camera_manager.release_all()
+    if calibrator:
+        calibrator.close()
+    snapshot_executor.shutdown(wait=False)
+    broadcaster.stop()
     logger.info("Detection service stopped")
 
 
@@ -77,7 +124,8 @@ async def health():
     
     cameras_connected = 0
     if camera_manager:
-        cameras_connected = len(camera_manager.get_available_cameras())
+        # A stale cache may fall back to probing devices - keep that off the event loop
+        cameras_connected = len(await asyncio.to_thread(camera_manager.get_available_cameras))
     
     return {
         "status": "ok",
@@ -96,9 +144,24 @@ async def start_detection(request: StartRequest):
     if detector and detector.is_running:
         return {"error": "Detection already running"}, 400
     
+    if not 0 <= request.pyramid_levels <= TriangleDartDetector.MAX_PYRAMID_LEVELS:
+        return {"error": f"pyramid_levels must be between 0 and {TriangleDartDetector.MAX_PYRAMID_LEVELS}"}, 400
+    
+    recorder = None
     try:
         logger.info(f"Starting detection with cameras: {request.camera_indices}")
         
+        # Live cameras, or a recorded session
+        frame_source = camera_manager
+        frame_interval = 0.033  # Nominal camera frame period, refined from frame timestamps
+        if request.replay_path:
+            frame_source = ReplayCameraManager(request.replay_path, realtime=request.replay_realtime)
+            if not request.replay_realtime:
+                frame_interval = 0.0
+        
+        if request.record_path:
+            recorder = FrameRecorder(request.record_path, request.camera_indices, request.record_codec)
+        
         # Initialize detector
         detector = DartDetector(
             camera_indices=request.camera_indices,
@@ -106,19 +169,44 @@ async def start_detection(request: StartRequest):
             on_dart_detected=broadcast_dart_detected,
             on_takeout_detected=broadcast_takeout_detected,
             calibrator=calibrator,
-            triangle_detector=triangle_detector
+            triangle_detector=triangle_detector,
+            camera_manager=frame_source,
+            processing_mode=request.processing_mode,
+            max_workers=request.max_workers,
+            detection_space=request.detection_space,
+            motion_gate=request.motion_gate,
+            gate_pixel_threshold=request.gate_pixel_threshold,
+            gate_min_fraction=request.gate_min_fraction,
+            fusion_commit_margin=request.fusion_commit_margin,
+            fusion_mode=request.fusion_mode,
+            recorder=recorder,
+            frame_interval=frame_interval,
+            takeout_threshold=request.takeout_threshold,
+            debug_stream=debug_stream,
+            background_alpha=request.background_alpha
         )
         
+        # Shared detector: only reconfigure it once the session is sure to start
+        triangle_detector.pyramid_levels = request.pyramid_levels
+        
         # Start detection in background
         asyncio.create_task(detector.start())
         
         return {
             "status": "started",
             "cameras": request.camera_indices,
-            "resolution": request.resolution
+            "resolution": request.resolution,
+            "processing_mode": request.processing_mode,
+            "detection_space": request.detection_space,
+            "pyramid_levels": request.pyramid_levels,
+            "recording": request.record_path,
+            "replay": request.replay_path
         }
     except Exception as e:
         logger.error(f"Failed to start detection: {e}")
+        if recorder is not None:
+            # No detector owns it - stop its writer thread and close its files
+            await asyncio.to_thread(recorder.close)
         return {"error": str(e)}, 500
 
 
@@ -139,6 +227,42 @@ async def stop_detection():
         return {"error": str(e)}, 500
 
 
+@app.get("/stats")
+async def detection_stats():
+    """Per-camera processing statistics"""
+    if not detector:
+        return {"error": "Detector not running"}, 400
+    
+    return {
+        "processing": detector.get_processing_stats(),
+        "debug_stream": debug_stream.get_stats(),
+        "events": broadcaster.get_stats(),
+        "calibration_store": calibrator.store.get_stats() if calibrator else None,
+        "artifacts": calibrator.artifacts.get_stats() if calibrator else None
+    }
+
+
+@app.get("/debug/{camera_id}/stream")
+async def debug_stream_view(camera_id: int):
+    """
+    MJPEG stream of what the detector sees for one camera: the board view
+    with the fitted triangle and tip, and the difference image with contours.
+    
+    Open in a browser or <img src=...>. Frames are encoded once and shared
+    by all viewers; slow viewers skip frames.
+    """
+    return StreamingResponse(
+        debug_stream.mjpeg(camera_id),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}"
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage timings and frame/event counters in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/calibrate")
 async def calibrate(request: CalibrationRequest):
     """Set calibration data for the dartboard"""
@@ -172,20 +296,21 @@ async def set_reference():
 
 
 @app.get("/cameras")
-async def list_cameras():
-    """List available camera devices"""
+async def list_cameras(refresh: bool = False):
+    """List available camera devices (cached inventory, ?refresh=true to rescan)"""
     if not camera_manager:
         return {"cameras": []}
     
-    available = camera_manager.get_available_cameras()
+    inventory = await asyncio.to_thread(camera_manager.get_camera_inventory, 10, refresh)
     return {
         "cameras": [
             {
-                "index": idx,
-                "name": f"Camera {idx}",
-                "device": f"/dev/video{idx}"
+                "index": device.index,
+                "name": device.name,
+                "device": device.device,
+                "in_use": device.in_use
             }
-            for idx in available
+            for device in inventory
         ]
     }
 
@@ -200,33 +325,45 @@ class CalibrationPoints(BaseModel):
     right_y: int
 
 
+async def run_blocking(fn, *args):
+    """Run blocking camera/CV work on the snapshot pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(snapshot_executor, fn, *args)
+
+
+def encode_jpeg(frame) -> str:
+    """JPEG-encode a frame as base64 for the calibration UI"""
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return base64.b64encode(buffer).decode('utf-8')
+
+
+def render_snapshot(camera_id: int) -> Optional[dict]:
+    """Grab and encode a raw camera frame (runs on the snapshot pool)"""
+    frame = camera_manager.grab_frame(camera_id)
+    if frame is None:
+        return None
+    
+    return {
+        "camera_id": camera_id,
+        "image": encode_jpeg(frame),
+        "width": frame.shape[1],
+        "height": frame.shape[0]
+    }
+
+
 @app.get("/calibrate/{camera_id}/snapshot")
 async def get_camera_snapshot(camera_id: int):
     """Get a snapshot from camera for calibration UI"""
-    import cv2
-    import base64
+    if not camera_manager:
+        return {"error": "Camera manager not initialized"}, 500
     
     try:
-        cap = cv2.VideoCapture(camera_id)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
-        ret, frame = cap.read()
-        cap.release()
+        snapshot = await run_blocking(render_snapshot, camera_id)
         
-        if not ret:
+        if snapshot is None:
             return {"error": f"Could not capture from camera {camera_id}"}, 400
         
-        # Encode as JPEG
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        return {
-            "camera_id": camera_id,
-            "image": img_base64,
-            "width": frame.shape[1],
-            "height": frame.shape[0]
-        }
+        return snapshot
     except Exception as e:
         logger.error(f"Snapshot failed: {e}")
         return {"error": str(e)}, 500
@@ -260,7 +397,8 @@ async def calibrate_camera(camera_id: int, points: CalibrationPoints):
             return {
                 "status": "calibrated",
                 "message": result.message,
-                "camera_id": camera_id
+                "camera_id": camera_id,
+                "version": result.version
             }
         else:
             return {"status": "failed", "message": result.message}, 400
@@ -269,43 +407,43 @@ async def calibrate_camera(camera_id: int, points: CalibrationPoints):
         return {"error": str(e)}, 500
 
 
+def render_preview(camera_id: int) -> tuple[Optional[dict], Optional[str]]:
+    """Grab, warp, overlay and encode a frame (runs on the snapshot pool)"""
+    frame = camera_manager.grab_frame(camera_id)
+    if frame is None:
+        return None, f"Could not capture from camera {camera_id}"
+    
+    # Transform and overlay
+    transformed = calibrator.transform_frame(frame, camera_id)
+    if transformed is None:
+        return None, "Could not transform frame"
+    
+    with_overlay = calibrator.draw_board_overlay(transformed, camera_id)
+    
+    return {
+        "camera_id": camera_id,
+        "width": calibrator.target_size[0],
+        "height": calibrator.target_size[1],
+        "image": encode_jpeg(with_overlay),
+        "is_calibrated": True
+    }, None
+
+
 @app.get("/calibrate/{camera_id}/preview")
 async def preview_calibration(camera_id: int):
     """Preview calibrated view with board overlay"""
-    import cv2
-    import base64
-    
     if not calibrator or not calibrator.is_calibrated(camera_id):
         return {"error": f"Camera {camera_id} not calibrated"}, 400
+    if not camera_manager:
+        return {"error": "Camera manager not initialized"}, 500
     
     try:
-        cap = cv2.VideoCapture(camera_id)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
-        ret, frame = cap.read()
-        cap.release()
-        
-        if not ret:
-            return {"error": f"Could not capture from camera {camera_id}"}, 400
+        preview, error = await run_blocking(render_preview, camera_id)
         
-        # Transform and overlay
-        transformed = calibrator.transform_frame(frame, camera_id)
-        if transformed is None:
-            return {"error": "Could not transform frame"}, 400
+        if preview is None:
+            return {"error": error}, 400
         
-        with_overlay = calibrator.draw_board_overlay(transformed, camera_id)
-        
-        _, buffer = cv2.imencode('.jpg', with_overlay, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        return {
-            "camera_id": camera_id,
-            "width": 800,
-            "height": 800,
-            "image": img_base64,
-            "is_calibrated": True
-        }
+        return preview
     except Exception as e:
         logger.error(f"Preview failed: {e}")
         return {"error": str(e)}, 500
@@ -325,6 +463,33 @@ async def calibration_status():
     return {"calibrated_cameras": calibrated}
 
 
+@app.get("/calibrate/{camera_id}/history")
+async def calibration_history(camera_id: int):
+    """Saved calibration versions for a camera, newest first"""
+    if not calibrator:
+        return {"error": "Calibrator not initialized"}, 500
+    
+    return {"camera_id": camera_id, "versions": calibrator.get_history(camera_id)}
+
+
+@app.post("/calibrate/{camera_id}/rollback/{version}")
+async def rollback_calibration(camera_id: int, version: int):
+    """Make an earlier calibration version active again"""
+    if not calibrator:
+        return {"error": "Calibrator not initialized"}, 500
+    
+    result = calibrator.rollback(camera_id, version)
+    if not result.success:
+        return {"status": "failed", "message": result.message}, 404
+    
+    return {
+        "status": "rolled_back",
+        "message": result.message,
+        "camera_id": camera_id,
+        "version": version
+    }
+
+
 @app.delete("/calibrate/{camera_id}")
 async def clear_calibration(camera_id: int):
     """Clear calibration for camera"""
@@ -336,24 +501,63 @@ async def clear_calibration(camera_id: int):
 
 
 @app.websocket("/events")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time detection events"""
-    await websocket.accept()
-    active_connections.append(websocket)
-    logger.info(f"WebSocket connected. Active connections: {len(active_connections)}")
+async def websocket_endpoint(websocket: WebSocket, since: Optional[int] = None, encoding: Optional[str] = None):
+    """
+    WebSocket endpoint for real-time detection events.
     
-    try:
-        while True:
-            # Keep connection alive
-            await asyncio.sleep(1)
-            await websocket.send_json({"type": "ping"})
-    except WebSocketDisconnect:
-        active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Active connections: {len(active_connections)}")
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+    Pass ?since=<seq> (the last seq received) on reconnect to have missed
+    events replayed before live events continue.
+    
+    Events are JSON text frames by default. Offer the mydarts.msgpack
+    subprotocol (or pass ?encoding=msgpack) for MessagePack binary frames.
+    """
+    offered = websocket.scope.get("subprotocols", [])
+    fmt = encoding or ("msgpack" if MSGPACK_SUBPROTOCOL in offered else "json")
+    if fmt not in FORMATS:
+        await websocket.close(code=1003)  # Unsupported data
+        return
+    
+    subprotocol = MSGPACK_SUBPROTOCOL if fmt == "msgpack" and MSGPACK_SUBPROTOCOL in offered else None
+    await websocket.accept(subprotocol=subprotocol)
+    await broadcaster.serve(websocket, since, fmt)
+
+
+@app.get("/events/stream")
+async def event_stream(since: Optional[int] = None, last_event_id: Optional[int] = Header(None)):
+    """
+    Server-sent events: every event after the cursor, then live events.
+    
+    The cursor is ?since=<seq> or the Last-Event-ID header EventSource sends
+    on reconnect; without either, only new events are streamed.
+    """
+    cursor = since if since is not None else last_event_id
+    return StreamingResponse(
+        broadcaster.sse(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/events/poll")
+async def event_poll(since: Optional[int] = None, timeout: float = 25.0):
+    """
+    Long-poll: returns as soon as there are events after since, or empty
+    after timeout seconds. Pass the returned cursor as since next time;
+    without since, only new events are returned.
+    """
+    if since is None:
+        since = broadcaster.last_seq
+    events, complete = await broadcaster.wait_since(since, min(max(timeout, 0.0), 60.0))
+    cursor = events[-1].seq if events else min(since, broadcaster.last_seq)
+    if not complete and not events:
+        cursor = broadcaster.last_seq
+    
+    # Events are already serialized - splice them in instead of re-encoding
+    body = (
+        f'{{"cursor":{cursor},"complete":{"true" if complete else "false"},'
+        f'"events":[{",".join(event.encode("json") for event in events)}]}}'
+    )
+    return Response(body, media_type="application/json")
 
 
 async def broadcast_dart_detected(event: dict):
@@ -370,18 +574,10 @@ async def broadcast_dart_detected(event: dict):
     
     logger.info(f"Broadcasting dart: {event['segment']}")
     
-    # Send to all connected clients
-    disconnected = []
-    for connection in active_connections:
-        try:
-            await connection.send_json(message)
-        except Exception as e:
-            logger.error(f"Failed to send to WebSocket: {e}")
-            disconnected.append(connection)
-    
-    # Remove disconnected clients
-    for conn in disconnected:
-        active_connections.remove(conn)
+    # Queued per client - never waits on a socket
+    start = time.perf_counter()
+    broadcaster.publish(message)
+    STAGE_SECONDS.observe_since(start, "broadcast")
 
 
 async def broadcast_takeout_detected():
@@ -393,16 +589,9 @@ async def broadcast_takeout_detected():
     
     logger.info("Broadcasting takeout")
     
-    disconnected = []
-    for connection in active_connections:
-        try:
-            await connection.send_json(message)
-        except Exception as e:
-            logger.error(f"Failed to send to WebSocket: {e}")
-            disconnected.append(connection)
-    
-    for conn in disconnected:
-        active_connections.remove(conn)
+    start = time.perf_counter()
+    broadcaster.publish(message)
+    STAGE_SECONDS.observe_since(start, "broadcast")
 
 
 if __name__ == "__main__":